@@ -1,11 +1,32 @@
 from src.trace_analyzer import EnhancedTraceAnalyzer
 import asyncio
+import io
 import json
+import sys
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional C-accelerated encoder
+    orjson = None
 
 async def main():
     analyzer = EnhancedTraceAnalyzer('traces/enhanced-test.json')
     result = await analyzer.analyze_all()
-    print(json.dumps(result, indent=2))
+    sys.stdout.flush()
+    if orjson is not None:
+        sys.stdout.buffer.write(orjson.dumps(result, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE))
+        sys.stdout.buffer.flush()
+        return
+
+    # Stream the JSON through a large buffer so big traces don't cost a write per chunk
+    writer = io.TextIOWrapper(io.BufferedWriter(sys.stdout.buffer, buffer_size=1 << 20), encoding='utf-8')
+    try:
+        json.dump(result, writer, indent=2)
+        writer.write('\n')
+    finally:
+        writer.flush()
+        # Detach rather than close so sys.stdout stays usable
+        writer.detach().detach()
 
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    asyncio.run(main())
@@ -4,44 +4,123 @@ import argparse
 import os
 import sys
 from pathlib import Path
+from urllib.parse import urlparse
 import json
-import tempfile
+import re
+import copy
+import atexit
+import functools
+import contextlib
+import uuid
+from contextvars import ContextVar
+from typing import TYPE_CHECKING
+
+try:
+    import orjson
+except ImportError:  # optional C-accelerated encoder
+    orjson = None
 
 # Add the project root to PYTHONPATH
 project_root = str(Path(__file__).parent.parent)
 sys.path.append(project_root)
 
-from browser_use.browser.browser import Browser, BrowserConfig
-from browser_use.browser.context import BrowserContext, BrowserContextConfig, BrowserContextWindowSize
-from src.agent.custom_agent import CustomAgent
-from src.controller.custom_controller import CustomController
-from src.agent.custom_prompts import CustomSystemPrompt
-from src.utils import utils
-from dotenv import load_dotenv
-from src.trace_analyzer import analyze_trace
+# browser_use, langchain and the agent stack are imported where they are used,
+# so `--help`, `close` and `analyze-trace` don't pay for loading them.
+if TYPE_CHECKING:
+    from browser_use.browser.browser import Browser
+    from browser_use.browser.context import BrowserContext, BrowserContextConfig
 
-# Load .env from the project root
-load_dotenv(Path(project_root) / '.env')
+@functools.lru_cache(maxsize=None)
+def _load_env():
+    """Load .env from the project root once, before anything reads provider settings."""
+    from dotenv import load_dotenv
+    load_dotenv(Path(project_root) / '.env')
 
 # Global variables for browser persistence
 _global_browser = None
 _global_browser_context = None
+# Launch options of the global browser, to skip relaunching with identical ones
+_global_browser_options = None
+# Context config captured at launch; the context itself is created on first use
+_global_context_config = None
+# _context_sig() of the config the global context was created with
+_global_context_sig = None
+# context_id of the global context whose initial trace chunk has been discarded
+_traced_context_id = None
 
-def _get_browser_state():
-    """Get browser state from temporary file."""
-    temp_file = os.path.join(tempfile.gettempdir(), "browser_use_state")
-    try:
-        with open(temp_file, "r") as f:
-            return f.read().strip().lower() == "true"
-    except FileNotFoundError:
-        return False
+# Browser context bound to the task running in the current asyncio context
+_ctx_var: ContextVar = ContextVar("bctx", default=None)
+# Shared async HTTP clients for OpenAI-compatible LLM providers, keyed by provider
+_global_llm_clients = {}
+# Event loop the shared LLM clients (and the cached LLMs holding them) belong to
+_llm_clients_loop = None
+# Per-event-loop pools of browser contexts for concurrent run_browser_task calls
+_context_pools = {}
+
+# Per-task command context cache, keyed on the options that shape it
+_cmd_ctx_cache = {}
+
+# Open descriptors for the wrapper's --temp-file state files, reused across writes
+_state_file_fds = {}
+
+_STATE_FILE_VALUES = {True: b"true\n", False: b"false"}
 
 def _set_browser_state(running=True, temp_file_path=None):
-    """Set browser state in a temporary file."""
-    value = str(running).lower()
+    """Set browser state in the wrapper's temporary file, if given."""
     if temp_file_path:
-        with open(temp_file_path, "w") as f:
-            f.write(value)
+        fd = _state_file_fds.get(temp_file_path)
+        if fd is None:
+            fd = os.open(temp_file_path, os.O_RDWR | os.O_CREAT, 0o600)
+            _state_file_fds[temp_file_path] = fd
+        # Both values are five bytes, so one pwrite fully replaces the previous
+        # one without a truncate; the wrapper's $(cat ...) drops the newline
+        os.pwrite(fd, _STATE_FILE_VALUES[running], 0)
+
+@atexit.register
+def _close_state_files():
+    """Close the cached wrapper state file descriptors."""
+    for fd in _state_file_fds.values():
+        try:
+            os.close(fd)
+        except OSError:
+            pass
+    _state_file_fds.clear()
+
+@functools.lru_cache(maxsize=8)
+def _make_browser_config(headless, disable_security, user_data_dir, extra_chromium_args, proxy):
+    """Build a BrowserConfig once per set of launch options.
+
+    Arguments must be hashable: ``extra_chromium_args`` is a tuple and a dict
+    ``proxy`` is passed as a tuple of its items.
+    """
+    from browser_use.browser.browser import BrowserConfig
+
+    return BrowserConfig(
+        headless=headless,
+        disable_security=disable_security,
+        chrome_instance_path=user_data_dir,
+        extra_chromium_args=list(extra_chromium_args),
+        proxy=dict(proxy) if isinstance(proxy, tuple) else proxy
+    )
+
+@functools.lru_cache(maxsize=8)
+def _make_context_config(trace_path, record_path, width, height, disable_security):
+    """Build a BrowserContextConfig once per set of options.
+
+    The result is shared; callers deep-copy it before handing it to browser_use.
+    """
+    from browser_use.browser.context import BrowserContextConfig, BrowserContextWindowSize
+
+    return BrowserContextConfig(
+        trace_path=trace_path,
+        save_recording_path=record_path,
+        no_viewport=False,
+        browser_window_size=BrowserContextWindowSize(
+            width=width,
+            height=height
+        ),
+        disable_security=disable_security
+    )
 
 async def initialize_browser(
     headless=False,
@@ -50,61 +129,568 @@ async def initialize_browser(
     user_data_dir=None,
     proxy=None
 ):
-    """Initialize a new browser instance with the given configuration."""
-    global _global_browser, _global_browser_context
+    """Initialize a new browser instance with the given configuration.
+
+    Only the browser is launched here; the browser context is created by the
+    first task, once it knows whether tracing or recording is needed.
+    """
+    global _global_browser, _global_browser_context, _global_context_config, _global_context_sig
+    global _global_browser_options
     
-    # Check both environment and global variables
-    if _get_browser_state() or _global_browser is not None:
-        # Close any existing browser first
-        if _global_browser is not None:
-            await close_browser()
-        else:
-            _set_browser_state(False)
+    # Keep a healthy browser (and its context) launched with the same options
+    options = (headless, tuple(window_size), disable_security, user_data_dir, proxy)
+    if options == _global_browser_options and _browser_is_connected():
+        return True
+    
+    # Close any existing browser first
+    if _global_browser is not None:
+        await close_browser()
         
+    _load_env()
+    from browser_use.browser.browser import Browser
+
     window_w, window_h = window_size
     
     # Initialize browser with launch-time options
     browser = Browser(
-        config=BrowserConfig(
-            headless=headless,
-            disable_security=disable_security,
-            chrome_instance_path=user_data_dir,
-            extra_chromium_args=[f"--window-size={window_w},{window_h}"],
-            proxy=proxy
-        )
-    )
-    
-    # Create initial browser context
-    browser_context = await browser.new_context(
-        config=BrowserContextConfig(
-            no_viewport=False,
-            browser_window_size=BrowserContextWindowSize(
-                width=window_w,
-                height=window_h
-            ),
-            disable_security=disable_security
+        config=_make_browser_config(
+            headless,
+            disable_security,
+            user_data_dir,
+            (f"--window-size={window_w},{window_h}",),
+            tuple(sorted(proxy.items())) if isinstance(proxy, dict) else proxy
         )
     )
     
     # Store globally
     _global_browser = browser
-    _global_browser_context = browser_context
-    _set_browser_state(True)
+    _global_browser_options = options
+    _global_browser_context = None
+    _global_context_sig = None
+    _global_context_config = _make_context_config(None, None, window_w, window_h, disable_security)
+    return True
+
+async def _ensure_browser(on_init=None, **browser_options):
+    """Make sure this process has a browser, initializing one only if needed.
+
+    Returns True when a browser is available. ``on_init`` is awaited after a
+    fresh start.
+    """
+    if _global_browser is not None:
+        return True
+
+    print("Browser not running. Starting browser session...")
+    if not await initialize_browser(**browser_options) or _global_browser is None:
+        return False
+
+    # Signal successful initialization if callback provided
+    if on_init:
+        await on_init()
+    return True
+
+def _browser_is_connected():
+    """Whether the global browser exists and its Playwright browser (if launched yet) is connected."""
+    if _global_browser is None:
+        return False
+    playwright_browser = _global_browser.playwright_browser
+    return playwright_browser is None or playwright_browser.is_connected()
+
+def current_browser_context():
+    """Return the browser context used by the task running in the current asyncio context."""
+    return _ctx_var.get()
+
+def _get_context_pool():
+    """Return the context pool registered for the running event loop, if any."""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+    return _context_pools.get(loop)
+
+async def initialize_browser_pool(size, **browser_options):
+    """Create a pool of `size` browser contexts for concurrent tasks on the running loop.
+
+    While a pool exists, run_browser_task checks a context out of it instead of
+    sharing the single global context, so concurrent tasks do not contend.
+    """
+    if _global_browser is None:
+        if not await initialize_browser(**browser_options):
+            return False
+
+    pool = asyncio.Queue()
+    contexts = await asyncio.gather(*[
+        _global_browser.new_context(config=copy.deepcopy(_global_context_config))
+        for _ in range(size)
+    ])
+    for browser_context in contexts:
+        pool.put_nowait(browser_context)
+    _context_pools[asyncio.get_running_loop()] = pool
     return True
 
 async def close_browser():
     """Close the current browser instance if one exists."""
-    global _global_browser, _global_browser_context
+    global _global_browser, _global_browser_context, _global_context_sig, _global_browser_options
     
+    # Contexts close together first: each saves its trace/video while the browser is still up
+    contexts = []
+    pool = _get_context_pool()
+    _context_pools.clear()
+    if pool is not None:
+        while not pool.empty():
+            contexts.append(pool.get_nowait())
     if _global_browser_context is not None:
-        await _global_browser_context.close()
+        contexts.append(_global_browser_context)
         _global_browser_context = None
-        
+    _global_context_sig = None
+    if contexts:
+        await asyncio.gather(*[ctx.close() for ctx in contexts], return_exceptions=True)
+    
+    # The browser process and the LLM HTTP clients are independent of each other;
+    # clients from a loop that is already gone are dropped rather than closed
+    _drop_llm_clients_of_other_loops()
+    closers = [client.aclose() for client in _global_llm_clients.values()]
+    _global_llm_clients.clear()
     if _global_browser is not None:
-        await _global_browser.close()
+        closers.append(_global_browser.close())
         _global_browser = None
+    _global_browser_options = None
+    if closers:
+        await asyncio.gather(*closers, return_exceptions=True)
+    # Cached LLM clients hold the HTTP clients closed above
+    _get_llm_cached.cache_clear()
     
-    _set_browser_state(False)
+    _cmd_ctx_cache.clear()
+
+@functools.lru_cache(maxsize=32)
+def _ensure_trace_dir(trace_path):
+    """Create the trace directory once and return the trace file path for it.
+
+    Accepts a str or Path; the Path is built once and reused.
+    """
+    trace_dir = Path(trace_path)
+    if trace_dir.suffix != '.zip':
+        trace_dir = trace_dir / 'trace.zip'
+    trace_dir.parent.mkdir(parents=True, exist_ok=True)
+    return os.fspath(trace_dir)
+
+# utils.model_names key for each (lowercased) CLI provider name
+_PROVIDER_KEY = {"deepseek": "deepseek", "google": "gemini", "openai": "openai", "anthropic": "anthropic"}
+
+# Default entry in utils.model_names for each provider when no model_index is given:
+# deepseek-chat, gemini-1.5-pro, gpt-4o and claude-3-5-sonnet-latest
+_DEFAULT_IDX = {"deepseek": 0, "gemini": 0, "openai": 0, "anthropic": 0}
+
+# Whether each provider's models accept screenshots
+_SUPPORTS_VISION = {"deepseek": False, "gemini": True, "openai": True, "anthropic": True}
+
+# Bounds for the in-process LLM response cache
+_LLM_CACHE_MAXSIZE = 1024
+_LLM_CACHE_TTL = 3600.0
+
+@functools.lru_cache(maxsize=None)
+def _llm_response_cache():
+    """Return the process-wide LLM response cache.
+
+    langchain consults it in ``invoke``/``ainvoke`` (structured output included),
+    keyed on the serialized messages and the model's parameters, so a repeated
+    prompt to the same model and temperature skips the provider round-trip.
+    Entries expire after ``_LLM_CACHE_TTL`` seconds.
+    """
+    import time
+    from langchain_core.caches import InMemoryCache
+
+    class _TTLInMemoryCache(InMemoryCache):
+        def __init__(self, maxsize, ttl):
+            super().__init__(maxsize=maxsize)
+            self._ttl = ttl
+            self._stored_at = {}
+
+        def lookup(self, prompt, llm_string):
+            key = (prompt, llm_string)
+            stored_at = self._stored_at.get(key)
+            if stored_at is not None and time.monotonic() - stored_at > self._ttl:
+                self._cache.pop(key, None)
+                del self._stored_at[key]
+                return None
+            return super().lookup(prompt, llm_string)
+
+        def update(self, prompt, llm_string, return_val):
+            if len(self._cache) >= self._maxsize:
+                # InMemoryCache evicts its oldest entry; drop that timestamp too
+                self._stored_at.pop(next(iter(self._cache)), None)
+            super().update(prompt, llm_string, return_val)
+            self._stored_at[(prompt, llm_string)] = time.monotonic()
+
+        def clear(self, **kwargs):
+            super().clear(**kwargs)
+            self._stored_at.clear()
+
+    return _TTLInMemoryCache(maxsize=_LLM_CACHE_MAXSIZE, ttl=_LLM_CACHE_TTL)
+
+def _get_llm_http_client(provider_key):
+    """Return the shared HTTP client for an OpenAI-compatible provider.
+
+    Reusing one client keeps the provider's connection pool (and its TLS
+    sessions) warm across tasks. Other providers manage their own transport.
+    """
+    if provider_key not in ("openai", "deepseek"):
+        return None
+    client = _global_llm_clients.get(provider_key)
+    if client is None:
+        import httpx
+        client = _global_llm_clients[provider_key] = httpx.AsyncClient()
+    return client
+
+@functools.lru_cache(maxsize=8)
+def _get_llm_cached(provider_key, model_name, temperature, vision, use_cache=True):
+    """Build the LLM client for a model once and share it between tasks."""
+    from src.utils import utils
+
+    llm = utils.get_llm_model(
+        provider=provider_key,
+        model_name=model_name,
+        temperature=temperature,
+        vision=vision,
+        http_async_client=_get_llm_http_client(provider_key)
+    )
+    if use_cache:
+        llm.cache = _llm_response_cache()
+    return llm
+
+def _build_browser_command_context(provider, model_index, vision, record, record_path, trace_path, use_cache=True):
+    """Resolve the controller, LLM and context config for a task."""
+    _load_env()
+    from src.controller.custom_controller import CustomController
+    from src.utils import utils
+
+    # Normalize provider name to lowercase for consistency
+    provider = provider.lower()
+
+    # Select appropriate model based on provider, model_index, and vision requirement
+    provider_key = _PROVIDER_KEY.get(provider)
+    if provider_key is None:
+        raise ValueError(f"Unsupported provider: {provider}")
+
+    # Fall back to text-only for providers without vision (Deepseek)
+    if vision and not _SUPPORTS_VISION[provider_key]:
+        print(f"WARNING: {provider.capitalize()} does not support vision capabilities. Falling back to standard {provider.capitalize()} model.")
+        vision = False
+
+    if provider_key not in utils.model_names:
+        raise ValueError(f"No models found for provider: {provider}")
+
+    available_models = utils.model_names[provider_key]
+    
+    if model_index is not None:
+        if not (0 <= model_index < len(available_models)):
+            raise ValueError(f"Invalid model_index {model_index} for provider {provider}. Available indices: 0-{len(available_models)-1}")
+    model_name = available_models[model_index if model_index is not None else _DEFAULT_IDX[provider_key]]
+
+    # Initialize controller; screenshots are only taken when vision is in use
+    controller = CustomController(use_vision=vision)
+
+    # Get LLM model
+    llm = _get_llm_cached(provider_key, model_name, 0.8, vision, use_cache)
+
+    # Assemble the tracing/recording context config
+    trace_file = None
+    ctx_config = None
+    if record or trace_path:
+        trace_file = _ensure_trace_dir(trace_path) if trace_path else None
+
+        ctx_config = _make_context_config(
+            trace_file,
+            os.fspath(record_path) if record else None,
+            1920,
+            1080,
+            False
+        )
+
+    return {
+        "controller": controller,
+        "llm": llm,
+        "model_name": model_name,
+        "provider_key": provider_key,
+        "vision": vision,
+        "trace_file": trace_file,
+        "ctx_config": ctx_config
+    }
+
+def _drop_llm_clients_of_other_loops():
+    """Forget LLM clients created on an event loop other than the running one.
+
+    httpx clients are bound to the loop they first ran on, so clients left over
+    from a loop torn down without close_browser() must not be reused.
+    """
+    global _llm_clients_loop
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    if loop is _llm_clients_loop:
+        return
+    if _llm_clients_loop is not None:
+        _global_llm_clients.clear()
+        _get_llm_cached.cache_clear()
+        _cmd_ctx_cache.clear()
+    _llm_clients_loop = loop
+
+def get_cached_browser_command_context(provider, model_index, vision, record, record_path=None, trace_path=None, use_cache=True):
+    """Return the command context for a task, building it on first use.
+
+    The controller and LLM handle are shared between tasks with the same key;
+    the mutable context config is deep-copied so callers cannot corrupt the cache.
+    """
+    _drop_llm_clients_of_other_loops()
+    key = (provider, model_index, vision, record, record_path, trace_path, use_cache)
+    cmd_ctx = _cmd_ctx_cache.get(key)
+    if cmd_ctx is None:
+        cmd_ctx = _build_browser_command_context(provider, model_index, vision, record, record_path, trace_path, use_cache)
+        _cmd_ctx_cache[key] = cmd_ctx
+    cmd_ctx = dict(cmd_ctx)
+    cmd_ctx["ctx_config"] = copy.deepcopy(cmd_ctx["ctx_config"])
+    return cmd_ctx
+
+# Common case of a starting URL: http(s) with a host
+_URL_RE = re.compile(r'^https?://[^\s/]+')
+
+@functools.lru_cache(maxsize=256)
+def _validate_url(url):
+    """Return an error message for a malformed starting URL, or None if it is usable."""
+    if url and not _URL_RE.match(url):
+        # Other schemes or odd forms get the full parse
+        try:
+            result = urlparse(url)
+            if not all([result.scheme, result.netloc]):
+                raise ValueError("Invalid URL format")
+        except Exception as e:
+            return f"Invalid URL provided: {str(e)}"
+    return None
+
+async def run_browser_open_with_compact_snapshot(browser, cfg, first_url=None, old_context=None):
+    """Open a new context on the first URL while the previous context tears down.
+
+    Closing the old context and creating + navigating the new one are independent,
+    so they run concurrently instead of costing two sequential round-trips.
+    """
+    async def _open():
+        context = await browser.new_context(config=cfg)
+        if first_url:
+            try:
+                await context.navigate_to(first_url)
+            except Exception:
+                await context.close()
+                raise
+        return context
+
+    if old_context is None:
+        return await _open()
+
+    close_result, context = await asyncio.gather(
+        old_context.close(), _open(), return_exceptions=True
+    )
+    if isinstance(context, BaseException):
+        raise context
+    if isinstance(close_result, BaseException):
+        print(f"Warning: failed to close previous browser context: {close_result}")
+    return context
+
+def _context_sig(config):
+    """Fields of a context config that require a new browser context when they change.
+
+    The trace location is not part of it: traced runs write their own chunk.
+    """
+    window = config.browser_window_size
+    return (
+        bool(config.trace_path),
+        config.save_recording_path,
+        window.width,
+        window.height,
+        config.disable_security,
+    )
+
+async def _start_trace_chunk(browser_context):
+    """Begin a new trace chunk on a long-lived traced context.
+
+    ``tracing.start()`` (called by browser_use when the session is created, or
+    when tracing is turned on in place) also opens a first chunk; that one is
+    discarded so every run gets its own chunk.
+    """
+    global _traced_context_id
+
+    session = await browser_context.get_session()
+    tracing = session.context.tracing
+    if _traced_context_id != browser_context.context_id:
+        await tracing.stop_chunk()
+        _traced_context_id = browser_context.context_id
+    await tracing.start_chunk(name=uuid.uuid4().hex)
+    return tracing
+
+def _trace_in_place():
+    """Whether tracing may be started on a live context rather than a rebuilt one.
+
+    Set BROWSER_USE_TRACE_IN_PLACE=false to always create a fresh traced context.
+    """
+    return os.getenv("BROWSER_USE_TRACE_IN_PLACE", "true").lower() != "false"
+
+def _closed_context_trace(cmd_ctx, browser_context):
+    """Path of the trace browser_use saves when a traced context is closed."""
+    return os.path.join(cmd_ctx["trace_file"], f"{browser_context.context_id}.zip")
+
+async def _close_task_context(browser_context, trace_zip, pending):
+    """Close a context owned by a single task.
+
+    With a ``pending`` list, the trace is stopped here so it is complete on disk,
+    and the rest of the teardown (cookies, context close, video files) is left
+    running as a task appended to ``pending`` for the caller to await.
+    """
+    if pending is not None:
+        try:
+            if trace_zip is not None and browser_context.session is not None:
+                await browser_context.session.context.tracing.stop(path=trace_zip)
+        except Exception:
+            # Let browser_use stop tracing as part of a regular close
+            pass
+        else:
+            pending.append(asyncio.create_task(browser_context.close()))
+            return
+    await browser_context.close()
+
+async def _navigate_first(browser_context, url):
+    """Open a task's starting URL directly so the agent doesn't spend a step on it.
+
+    Returns whether the context is now on ``url``.
+    """
+    if not url:
+        return False
+    try:
+        await browser_context.navigate_to(url)
+        return True
+    except Exception as e:
+        print(f"Initial navigation to {url} failed ({e}). Leaving it to the agent...")
+        return False
+
+def _task_prompt(prompt, url, navigated):
+    """Task text for the agent: ask it to navigate only if that hasn't been done."""
+    if not url or navigated or url in prompt:
+        return prompt
+    return f"First, navigate to {url}. Then, {prompt}"
+
+@contextlib.asynccontextmanager
+async def _task_browser_context(cmd_ctx, url, record, trace_path, pending=None):
+    """Yield ``(browser_context, trace_zip, navigated)`` for a task and release it afterwards.
+
+    With a context pool on the running loop, plain tasks borrow a pooled context
+    and traced/recorded tasks get a dedicated one. Without a pool, the single
+    global context is kept alive across runs and only closed after recorded runs;
+    traced runs write one trace chunk each instead of recreating the context as
+    long as the config signature is unchanged. ``trace_zip`` is where this run's
+    trace is written (a chunk, or the file saved when the context closes), or
+    None when the run is not traced. Contexts closed after the run are handed
+    to ``pending`` as described in :func:`_close_task_context`. ``navigated`` is
+    True when the context was already taken to ``url``.
+    """
+    global _global_browser_context, _global_context_sig
+
+    pool = _get_context_pool()
+    if pool is not None:
+        if record or trace_path:
+            browser_context = await run_browser_open_with_compact_snapshot(
+                _global_browser, cmd_ctx["ctx_config"], first_url=url
+            )
+            navigated = bool(url)
+        else:
+            browser_context = await pool.get()
+            navigated = await _navigate_first(browser_context, url)
+        trace_zip = _closed_context_trace(cmd_ctx, browser_context) if trace_path else None
+        token = _ctx_var.set(browser_context)
+        try:
+            yield browser_context, trace_zip, navigated
+        finally:
+            _ctx_var.reset(token)
+            if record or trace_path:
+                # Close the context to ensure trace is saved
+                await _close_task_context(browser_context, trace_zip, pending)
+            else:
+                pool.put_nowait(browser_context)
+        return
+
+    # Recording needs a fresh context (videos are written on close); a traced run
+    # reuses the current context when its config signature matches
+    if record or trace_path:
+        new_sig = _context_sig(cmd_ctx["ctx_config"])
+    else:
+        new_sig = None
+    navigated = False
+
+    if (
+        new_sig is not None
+        and not record
+        and _global_browser_context is not None
+        and new_sig != _global_context_sig
+        and new_sig[1:] == _global_context_sig[1:]
+        and _trace_in_place()
+    ):
+        # Only tracing differs: turn it on for the live context instead of rebuilding
+        session = await _global_browser_context.get_session()
+        await session.context.tracing.start(screenshots=True, snapshots=True, sources=True)
+        _global_context_sig = new_sig
+    elif new_sig is not None and (record or _global_browser_context is None or new_sig != _global_context_sig):
+        try:
+            _global_browser_context = await run_browser_open_with_compact_snapshot(
+                _global_browser,
+                cmd_ctx["ctx_config"],
+                first_url=url,
+                old_context=_global_browser_context
+            )
+            navigated = bool(url)
+        except Exception as e:
+            print(f"Fast context setup failed ({e}). Falling back to sequential setup...")
+            # Close existing context first
+            if _global_browser_context is not None:
+                try:
+                    await _global_browser_context.close()
+                except Exception:
+                    pass
+            
+            _global_browser_context = await _global_browser.new_context(
+                config=cmd_ctx["ctx_config"]
+            )
+        _global_context_sig = new_sig
+    elif _global_browser_context is None:
+        # First plain task on this browser: create the launch-time context
+        _global_browser_context = await _global_browser.new_context(
+            config=copy.deepcopy(_global_context_config)
+        )
+        _global_context_sig = _context_sig(_global_context_config)
+
+    tracing = None
+    trace_zip = None
+    if trace_path and not record:
+        tracing = await _start_trace_chunk(_global_browser_context)
+        trace_zip = os.path.join(cmd_ctx["trace_file"], f"{uuid.uuid4().hex}.zip")
+    elif trace_path:
+        trace_zip = _closed_context_trace(cmd_ctx, _global_browser_context)
+
+    if not navigated:
+        navigated = await _navigate_first(_global_browser_context, url)
+
+    token = _ctx_var.set(_global_browser_context)
+    try:
+        yield _global_browser_context, trace_zip, navigated
+    finally:
+        _ctx_var.reset(token)
+        if tracing is not None:
+            os.makedirs(cmd_ctx["trace_file"], exist_ok=True)
+            await tracing.stop_chunk(path=trace_zip)
+
+    if record and _global_browser_context is not None:
+        # Close the context to ensure the recording is saved; otherwise it stays
+        # open for the next task until the browser is closed
+        browser_context = _global_browser_context
+        _global_browser_context = None
+        _global_context_sig = None
+        await _close_task_context(browser_context, trace_zip, pending)
 
 async def run_browser_task(
     prompt, 
@@ -124,188 +710,218 @@ async def run_browser_task(
     window_size=(1920, 1080),
     disable_security=False,
     user_data_dir=None,
-    proxy=None
+    proxy=None,
+    use_cache=True
 ):
     """Execute a task using the current browser instance, auto-initializing if needed."""
     global _global_browser, _global_browser_context
+    _load_env()
+    from src.agent.custom_agent import CustomAgent
+    from src.agent.custom_prompts import CustomSystemPrompt
+    from src.trace_analyzer import analyze_trace
     
     # Validate URL if provided
-    if url:
-        try:
-            from urllib.parse import urlparse
-            result = urlparse(url)
-            if not all([result.scheme, result.netloc]):
-                raise ValueError("Invalid URL format")
-        except Exception as e:
-            return f"Invalid URL provided: {str(e)}"
-
-    # Store the trace file path if tracing is enabled
-    trace_file = None
-    
-    # Check if browser is running and initialize if needed
-    if not _get_browser_state():
-        print("Browser not running. Starting browser session...")
-        if not await initialize_browser(
-            headless=headless,
-            window_size=window_size,
-            disable_security=disable_security,
-            user_data_dir=user_data_dir,
-            proxy=proxy
-        ):
-            return "Browser initialization failed"
-        
-        # Signal successful initialization if callback provided
-        if _get_browser_state() and on_init:
-            await on_init()
-    
-    # Verify browser state is consistent
-    if _global_browser is None or _global_browser_context is None:
-        print("Browser session state is inconsistent. Attempting to reinitialize...")
-        if not await initialize_browser(
-            headless=headless,
-            window_size=window_size,
-            disable_security=disable_security,
-            user_data_dir=user_data_dir,
-            proxy=proxy
-        ):
-            return "Browser reinitialization failed"
-        if _global_browser is None or _global_browser_context is None:
-            return "Browser session state remains inconsistent after reinitialization"
-
-    # Initialize controller
-    controller = CustomController()
+    url_error = _validate_url(url)
+    if url_error:
+        return url_error
 
-    # Normalize provider name to lowercase for consistency
-    provider = provider.lower()
+    # Initialize the browser unless this process already has one
+    if not await _ensure_browser(
+        headless=headless,
+        window_size=window_size,
+        disable_security=disable_security,
+        user_data_dir=user_data_dir,
+        proxy=proxy,
+        on_init=on_init
+    ):
+        return "Browser initialization failed"
 
-    # Handle Deepseek + vision case
-    if provider == "deepseek" and vision:
-        print("WARNING: Deepseek does not support vision capabilities. Falling back to standard Deepseek model.")
-        vision = False
-
-    # Select appropriate model based on provider, model_index, and vision requirement
-    provider_key = provider
-    if provider == "google":
-        provider_key = "gemini"
-    elif provider == "openai":
-        provider_key = "openai"
-    elif provider == "anthropic":
-        provider_key = "anthropic"
-    elif provider == "deepseek":
-        provider_key = "deepseek"
-    else:
-        raise ValueError(f"Unsupported provider: {provider}")
-
-    if provider_key not in utils.model_names:
-        raise ValueError(f"No models found for provider: {provider}")
-
-    available_models = utils.model_names[provider_key]
-    
-    if model_index is not None:
-        if not (0 <= model_index < len(available_models)):
-            raise ValueError(f"Invalid model_index {model_index} for provider {provider}. Available indices: 0-{len(available_models)-1}")
-        model_name = available_models[model_index]
-    else:
-        # Default model selection based on vision requirement
-        if provider_key == "deepseek":
-            model_name = available_models[0]  # deepseek-chat
-        elif provider_key == "gemini":
-            model_name = available_models[0]  # gemini-1.5-pro
-        elif provider_key == "openai":
-            model_name = available_models[0]  # gpt-4o
-        elif provider_key == "anthropic":
-            model_name = available_models[0]  # claude-3-5-sonnet-latest
-
-    # Get LLM model
-    llm = utils.get_llm_model(
-        provider=provider_key,
-        model_name=model_name,
-        temperature=0.8,
-        vision=vision
+    cmd_ctx = get_cached_browser_command_context(
+        provider=provider,
+        model_index=model_index,
+        vision=vision,
+        record=record,
+        record_path=record_path,
+        trace_path=trace_path,
+        use_cache=use_cache
     )
+    controller = cmd_ctx["controller"]
+    llm = cmd_ctx["llm"]
+    vision = cmd_ctx["vision"]
+    trace_file = cmd_ctx["trace_file"]
 
-    # Create new context with tracing/recording enabled
-    if record or trace_path:
-        # Close existing context first
-        if _global_browser_context is not None:
-            await _global_browser_context.close()
-        
-        # Create new context with tracing/recording enabled
-        if trace_path:
-            trace_dir = Path(trace_path)
-            if not trace_path.endswith('.zip'):
-                trace_dir = trace_dir / 'trace.zip'
-            trace_dir.parent.mkdir(parents=True, exist_ok=True)
-            trace_file = str(trace_dir)
-        else:
-            trace_file = None
-
-        _global_browser_context = await _global_browser.new_context(
-            config=BrowserContextConfig(
-                trace_path=trace_file,
-                save_recording_path=str(record_path) if record else None,
-                no_viewport=False,
-                browser_window_size=BrowserContextWindowSize(
-                    width=1920,
-                    height=1080
-                ),
-                disable_security=False
+    pending_closes = []
+    try:
+        async with _task_browser_context(cmd_ctx, url, record, trace_path, pending_closes) as (browser_context, trace_zip, navigated):
+            # Initialize agent; the starting URL is already open unless navigation failed
+            agent = CustomAgent(
+                task=_task_prompt(prompt, url, navigated),
+                add_infos=add_info,
+                llm=llm,
+                browser=_global_browser,
+                browser_context=browser_context,
+                controller=controller,
+                system_prompt_class=CustomSystemPrompt,
+                use_vision=vision,
+                tool_call_in_content=True,
+                max_actions_per_step=max_actions
             )
-        )
-    
-    # Initialize agent with starting URL if provided
-    agent = CustomAgent(
-        task=f"First, navigate to {url}. Then, {prompt}" if url else prompt,
-        add_infos=add_info,
-        llm=llm,
-        browser=_global_browser,
-        browser_context=_global_browser_context,
-        controller=controller,
-        system_prompt_class=CustomSystemPrompt,
-        use_vision=vision,
-        tool_call_in_content=True,
-        max_actions_per_step=max_actions
-    )
-    
-    # Run task
-    history = await agent.run(max_steps=max_steps)
-    result = history.final_result()
-    
-    # Close the context to ensure trace is saved
-    if _global_browser_context is not None:
-        await _global_browser_context.close()
-        _global_browser_context = None
+            
+            # Run task
+            history = await agent.run(max_steps=max_steps)
+            result = history.final_result()
+    except BaseException:
+        # Don't leave deferred context closes running behind a failed task
+        await asyncio.gather(*pending_closes, return_exceptions=True)
+        raise
     
-    # Analyze and display trace if enabled
+    # Analyze and display trace if enabled, while the task's context finishes closing
     if trace_file and not hide_trace:
         print("\nTrace Analysis:")
         print("=" * 50)
-        try:
-            # Find the actual trace file in the nested directory
-            trace_files = list(Path(str(trace_path)).rglob('*.zip'))
-            if trace_files:
-                actual_trace = str(trace_files[0])  # Use the first trace file found
-                print("\nTrace Analysis:")
-                print("=" * 50)
+        # The trace for this run is written to a known path; no need to search for it
+        actual_trace = trace_zip if trace_zip and os.path.exists(trace_zip) else None
+        if actual_trace:
+            async def _print_analysis():
                 try:
                     trace_analysis = await analyze_trace(actual_trace)
                     print(json.dumps(trace_analysis, indent=2))
                 except Exception as e:
                     print(f"Failed to analyze trace: {e}")
-            else:
-                print("No trace file found")
-        except Exception as e:
-            print(f"Error finding trace file: {e}")
+
+            await asyncio.gather(_print_analysis(), *pending_closes)
+            pending_closes.clear()
+        else:
+            print("No trace file found")
+    if pending_closes:
+        await asyncio.gather(*pending_closes)
     
     return result
 
-def main():
+async def run_browser_tasks(
+    prompts,
+    url=None,
+    provider="Deepseek",
+    model_index=None,
+    vision=False,
+    record=False,
+    record_path=None,
+    trace_path=None,
+    max_steps=10,
+    max_actions=1,
+    add_info="",
+    headless=False,
+    window_size=(1920, 1080),
+    disable_security=False,
+    user_data_dir=None,
+    proxy=None,
+    use_cache=True
+):
+    """Execute several tasks concurrently, one browser context per prompt on a shared browser."""
+    _load_env()
+    from src.agent.custom_agent import CustomAgent
+    from src.agent.custom_prompts import CustomSystemPrompt
+
+    url_error = _validate_url(url)
+    if url_error:
+        return [url_error for _ in prompts]
+
+    if not await _ensure_browser(
+        headless=headless,
+        window_size=window_size,
+        disable_security=disable_security,
+        user_data_dir=user_data_dir,
+        proxy=proxy
+    ):
+        return ["Browser initialization failed" for _ in prompts]
+
+    cmd_ctx = get_cached_browser_command_context(
+        provider=provider,
+        model_index=model_index,
+        vision=vision,
+        record=record,
+        record_path=record_path,
+        trace_path=trace_path,
+        use_cache=use_cache
+    )
+    ctx_config = cmd_ctx["ctx_config"] or _global_context_config
+
+    # One context per prompt; each traced context writes its own <context_id>.zip
+    contexts = await asyncio.gather(*[
+        _global_browser.new_context(config=copy.deepcopy(ctx_config)) for _ in prompts
+    ])
+
+    async def _run_agent(prompt, browser_context):
+        navigated = await _navigate_first(browser_context, url)
+        agent = CustomAgent(
+            task=_task_prompt(prompt, url, navigated),
+            add_infos=add_info,
+            llm=cmd_ctx["llm"],
+            browser=_global_browser,
+            browser_context=browser_context,
+            controller=cmd_ctx["controller"],
+            system_prompt_class=CustomSystemPrompt,
+            use_vision=cmd_ctx["vision"],
+            tool_call_in_content=True,
+            max_actions_per_step=max_actions
+        )
+        history = await agent.run(max_steps=max_steps)
+        return history.final_result()
+
+    try:
+        results = await asyncio.gather(
+            *[_run_agent(prompt, ctx) for prompt, ctx in zip(prompts, contexts)],
+            return_exceptions=True
+        )
+    finally:
+        # Close every context so traces and recordings are flushed
+        await asyncio.gather(*[ctx.close() for ctx in contexts], return_exceptions=True)
+
+    return [
+        f"Task failed: {result}" if isinstance(result, Exception) else result
+        for result in results
+    ]
+
+def _new_event_loop():
+    """Create the CLI event loop, using uvloop when installed.
+
+    On Python 3.12+ tasks run eagerly, so coroutines that finish without
+    suspending never get scheduled as separate loop iterations; older
+    versions keep the default task factory.
+    """
+    try:
+        import uvloop
+        loop = uvloop.new_event_loop()
+    except ImportError:
+        loop = asyncio.new_event_loop()
+    eager_task_factory = getattr(asyncio, "eager_task_factory", None)
+    if eager_task_factory is not None:
+        loop.set_task_factory(eager_task_factory)
+    return loop
+
+@functools.lru_cache(maxsize=None)
+def _get_runner():
+    """Return the event loop runner shared by CLI commands."""
+    runner = asyncio.Runner(loop_factory=_new_event_loop)
+    atexit.register(runner.close)
+    return runner
+
+def _run(coro):
+    """Run a coroutine to completion on the shared CLI event loop."""
+    return _get_runner().run(coro)
+
+# --provider choices shared by the run and run-batch commands
+_PROVIDER_CHOICES = ("Deepseek", "Google", "OpenAI", "Anthropic")
+
+@functools.lru_cache(maxsize=None)
+def _parser():
+    """Build the CLI argument parser once per process."""
     parser = argparse.ArgumentParser(description="Control a browser using natural language")
     subparsers = parser.add_subparsers(dest="command", help="Commands")
     
     # Start command
     start_parser = subparsers.add_parser("start", help="Start a new browser session")
-    start_parser.add_argument("--temp-file", help="Path to temporary file for storing browser state")
+    start_parser.add_argument("--temp-file", help=argparse.SUPPRESS)
     start_parser.add_argument("--headless", action="store_true", help="Run browser in headless mode")
     start_parser.add_argument("--window-size", default="1920x1080", help="Browser window size (WxH)")
     start_parser.add_argument("--disable-security", action="store_true", help="Disable browser security features")
@@ -314,10 +930,10 @@ def main():
     
     # Run command
     run_parser = subparsers.add_parser("run", help="Run a task in the current browser session")
-    run_parser.add_argument("--temp-file", help="Path to temporary file for storing browser state")
+    run_parser.add_argument("--temp-file", help=argparse.SUPPRESS)
     run_parser.add_argument("prompt", help="The task to perform")
     run_parser.add_argument("--url", required=True, help="The starting URL for the browser automation task")
-    run_parser.add_argument("--provider", "-p", choices=["Deepseek", "Google", "OpenAI", "Anthropic"], 
+    run_parser.add_argument("--provider", "-p", choices=_PROVIDER_CHOICES, 
                            default="Deepseek", help="The LLM provider to use (system will select appropriate model)")
     run_parser.add_argument("--model-index", "-m", type=int,
                            help="Optional index to select a specific model from the provider's available models (0-based)")
@@ -329,16 +945,48 @@ def main():
     run_parser.add_argument("--max-steps", type=int, default=10, help="Maximum number of steps per task")
     run_parser.add_argument("--max-actions", type=int, default=1, help="Maximum actions per step")
     run_parser.add_argument("--add-info", help="Additional context for the agent")
+    run_parser.add_argument("--no-cache", action="store_true", help="Don't reuse cached LLM responses")
+    
+    # Run batch command
+    batch_parser = subparsers.add_parser("run-batch", help="Run several tasks concurrently in the current browser session")
+    batch_parser.add_argument("--temp-file", help=argparse.SUPPRESS)
+    batch_parser.add_argument("prompts", nargs="+", help="The tasks to perform, one browser context each")
+    batch_parser.add_argument("--url", help="Optional starting URL shared by all tasks")
+    batch_parser.add_argument("--provider", "-p", choices=_PROVIDER_CHOICES, 
+                           default="Deepseek", help="The LLM provider to use (system will select appropriate model)")
+    batch_parser.add_argument("--model-index", "-m", type=int,
+                           help="Optional index to select a specific model from the provider's available models (0-based)")
+    batch_parser.add_argument("--vision", action="store_true", help="Enable vision capabilities")
+    batch_parser.add_argument("--record", action="store_true", help="Enable session recording")
+    batch_parser.add_argument("--record-path", default="./tmp/record_videos", help="Path to save recordings")
+    batch_parser.add_argument("--trace-path", default="./tmp/traces", help="Path to save debugging traces")
+    batch_parser.add_argument("--max-steps", type=int, default=10, help="Maximum number of steps per task")
+    batch_parser.add_argument("--max-actions", type=int, default=1, help="Maximum actions per step")
+    batch_parser.add_argument("--add-info", help="Additional context for the agent")
+    batch_parser.add_argument("--no-cache", action="store_true", help="Don't reuse cached LLM responses")
     
     # Close command
     close_parser = subparsers.add_parser("close", help="Close the current browser session")
-    close_parser.add_argument("--temp-file", help="Path to temporary file for storing browser state")
+    close_parser.add_argument("--temp-file", help=argparse.SUPPRESS)
 
     # Analyze trace command
     analyze_parser = subparsers.add_parser("analyze-trace", help="Analyze a Playwright trace file")
     analyze_parser.add_argument("trace_path", help="Path to the trace file")
     analyze_parser.add_argument("--output", "-o", help="Path to save the analysis output (default: print to stdout)")
 
+    return parser
+
+def _write_json(obj, out):
+    """Write ``obj`` as indented JSON to a binary stream without building one large str."""
+    if orjson is not None:
+        out.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE))
+        return
+    for chunk in json.JSONEncoder(indent=2).iterencode(obj):
+        out.write(chunk.encode('utf-8'))
+    out.write(b'\n')
+
+def main():
+    parser = _parser()
     args = parser.parse_args()
     
     if args.command == "start":
@@ -350,23 +998,20 @@ def main():
             window_w, window_h = 1920, 1080
             
         # Start browser
-        success = asyncio.run(initialize_browser(
+        success = _run(initialize_browser(
             headless=args.headless,
             window_size=(window_w, window_h),
             disable_security=args.disable_security,
             user_data_dir=args.user_data_dir,
             proxy=args.proxy
         ))
-        if success:
-            print("Browser session started successfully")
-            _set_browser_state(True, args.temp_file)
-        else:
-            print("Failed to start browser session")
-            _set_browser_state(False, args.temp_file)
+        # Record the state before reporting it
+        _set_browser_state(bool(success), args.temp_file)
+        print("Browser session started successfully" if success else "Failed to start browser session")
             
     elif args.command == "run":
         # Run task
-        result = asyncio.run(run_browser_task(
+        result = _run(run_browser_task(
             prompt=args.prompt,
             url=args.url,
             provider=args.provider,
@@ -383,26 +1028,49 @@ def main():
             window_size=(1920, 1080),
             disable_security=False,
             user_data_dir=None,
-            proxy=None
+            proxy=None,
+            use_cache=not args.no_cache
         ))
         if result:
             print(result)
         
+    elif args.command == "run-batch":
+        # Run tasks concurrently
+        results = _run(run_browser_tasks(
+            prompts=args.prompts,
+            url=args.url,
+            provider=args.provider,
+            model_index=args.model_index,
+            vision=args.vision,
+            record=args.record,
+            record_path=args.record_path if args.record else None,
+            trace_path=args.trace_path,
+            max_steps=args.max_steps,
+            max_actions=args.max_actions,
+            add_info=args.add_info,
+            use_cache=not args.no_cache
+        ))
+        for index, result in enumerate(results, start=1):
+            print(f"[{index}] {result}")
+        
     elif args.command == "close":
         # Close browser
-        asyncio.run(close_browser())
-        print("Browser session closed")
+        _run(close_browser())
         _set_browser_state(False, args.temp_file)
+        print("Browser session closed")
 
     elif args.command == "analyze-trace":
         # Analyze trace
-        result = asyncio.run(analyze_trace(args.trace_path))
+        from src.trace_analyzer import analyze_trace
+        result = _run(analyze_trace(args.trace_path))
         if args.output:
-            with open(args.output, 'w') as f:
-                json.dump(result, f, indent=2)
+            with open(args.output, 'wb') as f:
+                _write_json(result, f)
             print(f"Analysis saved to {args.output}")
         else:
-            print(json.dumps(result, indent=2))
+            sys.stdout.flush()
+            _write_json(result, sys.stdout.buffer)
+            sys.stdout.buffer.flush()
         
     else:
         parser.print_help()
@@ -1,4 +1,6 @@
 import asyncio
+import logging
+import sys
 from src.utils.task_logging import (
     TaskLogger, TaskStatus, ActionType, RetryConfig,
     ColorScheme, SeparatorStyle
@@ -61,7 +63,7 @@ async def demo_logging():
         await logger.execute_with_retry(
             failing_operation,
             "click_search",
-            RetryConfig(max_retries=2, base_delay=0.1)
+            RetryConfig(max_retries=2, base_delay=0.1, jitter=0.2, timeout=5.0)
         )
     except ValueError:
         pass
@@ -84,16 +86,17 @@ async def demo_logging():
         results={"items_found": 10}
     )
     
-    # Display log history
-    print("\nLog History:")
-    print("=" * 80)
-    for entry in logger.get_log_history():
-        print(entry)
-    print("=" * 80)
+    # Display log history in a single write
+    rule = "=" * 80
+    sys.stdout.write("\n".join(["\nLog History:", rule, *logger.get_log_history(), rule]))
+    sys.stdout.write("\n")
+    sys.stdout.flush()
     
     # Log final state
     print("\nFinal State:")
     logger.log_state()
 
 if __name__ == "__main__":
+    # State dumps are only written while task logging is enabled for INFO
+    logging.basicConfig(level=logging.INFO)
     asyncio.run(demo_logging()) 
\ No newline at end of file
@@ -4,6 +4,8 @@
 # @ProjectName: browser-use-webui
 # @FileName: custom_action.py
 
+from typing import Optional
+
 import pyperclip
 from browser_use.agent.views import ActionResult
 from browser_use.browser.context import BrowserContext
@@ -11,9 +13,14 @@ from browser_use.controller.service import Controller
 from browser_use.browser.views import BrowserState
 
 
+# Pastes shorter than this are typed key by key instead of inserted at once
+_TYPE_MAX_LEN = 8
+
+
 class CustomController(Controller):
-    def __init__(self):
+    def __init__(self, use_vision: bool = False):
         super().__init__()
+        self.use_vision = use_vision
         self._register_custom_actions()
 
     def _register_custom_actions(self):
@@ -27,13 +34,19 @@ class CustomController(Controller):
         @self.registry.action("Paste text from clipboard", requires_browser=True)
         async def paste_from_clipboard(browser: BrowserContext):
             text = pyperclip.paste()
-            # send text to browser
+            # send text to browser: short text is typed so fields see real key
+            # events, longer text is inserted in a single Input.insertText call
             page = await browser.get_current_page()
-            await page.keyboard.type(text)
+            if len(text) < _TYPE_MAX_LEN:
+                await page.keyboard.type(text)
+            else:
+                await page.keyboard.insert_text(text)
 
             return ActionResult(extracted_content=text)
 
-    async def get_browser_state(self, browser_context: BrowserContext) -> BrowserState:
-        """Get the current state of the browser"""
-        state = await browser_context.get_state(use_vision=True)
+    async def get_browser_state(self, browser_context: BrowserContext, use_vision: Optional[bool] = None) -> BrowserState:
+        """Get the current state of the browser, with a screenshot only when vision is used"""
+        if use_vision is None:
+            use_vision = self.use_vision
+        state = await browser_context.get_state(use_vision=use_vision)
         return state
@@ -1,116 +1,489 @@
+import io
 import json
+import mmap
+import os
+import stat
 import zipfile
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Any
 import asyncio
+from collections.abc import Mapping
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _JSONDecodeError = orjson.JSONDecodeError
+except ImportError:  # optional C-accelerated parser
+    _json_loads = json.loads
+    _JSONDecodeError = json.JSONDecodeError
+
+try:
+    import ijson
+except ImportError:  # optional streaming parser for large HAR files
+    ijson = None
+
+# Read buffer for streaming trace members out of the zip
+_READ_BUFFER_SIZE = 1 << 20
+# Sections analyze_trace can report
+TRACE_SECTIONS = frozenset({"actions", "network", "console", "errors"})
+# Byte pattern of the only network event the enhanced analyzer keeps
+_RESPONSE_RECEIVED_NEEDLE = b'"Network.responseReceived"'
+# Archives at least this big are read through mmap
+_MMAP_MIN_SIZE = 1 << 20
+# Upper bound on threads used to parse zip members concurrently
+_MAX_MEMBER_WORKERS = 8
+
+def _read_member(zip_ref: zipfile.ZipFile, member: str) -> bytearray:
+    """Read a whole zip member into a buffer sized from its ZipInfo.
+
+    ZipFile.read() grows its result chunk by chunk; filling a preallocated
+    bytearray with readinto() copies each decompressed chunk only once.
+    """
+    buf = bytearray(zip_ref.getinfo(member).file_size)
+    with zip_ref.open(member) as f, memoryview(buf) as view:
+        filled = 0
+        while filled < len(buf):
+            n = f.readinto(view[filled:filled + _READ_BUFFER_SIZE])
+            if not n:
+                break
+            filled += n
+    if filled < len(buf):
+        del buf[filled:]
+    return buf
+
+class _MappedFile(mmap.mmap):
+    """Read-only mmap usable as the file object of a ZipFile."""
+
+    def seekable(self) -> bool:
+        # Only provided by mmap itself from Python 3.13
+        return True
+
+    def seek(self, pos: int, whence: int = 0) -> int:
+        # Report out-of-range seeks as OSError like a regular file so
+        # zipfile's corrupt-archive handling still applies
+        try:
+            return super().seek(pos, whence)
+        except ValueError as e:
+            raise OSError(str(e)) from None
+
+@contextmanager
+def _open_trace_zip(path) -> Iterator[zipfile.ZipFile]:
+    """Open a trace zip, backed by a read-only mmap of the file when large.
+
+    Member reads of big archives are then served from the page cache rather
+    than through buffered file reads. Small files, and files that cannot be
+    mapped, are opened normally.
+    """
+    with open(path, 'rb') as f:
+        mapped = None
+        if os.fstat(f.fileno()).st_size >= _MMAP_MIN_SIZE:
+            try:
+                mapped = _MappedFile(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (ValueError, OSError):
+                mapped = None
+        if mapped is None:
+            with zipfile.ZipFile(f, 'r') as zip_ref:
+                yield zip_ref
+        else:
+            with mapped, zipfile.ZipFile(mapped, 'r') as zip_ref:
+                yield zip_ref
 
 class PlaywrightTrace:
     def __init__(self, trace_path: str):
         self.trace_path = Path(trace_path)
-        self.actions: List[Dict[str, Any]] = []
-        self.network_requests: List[Dict[str, Any]] = []
+        # Actions are kept column-wise too; see the actions property
+        self._action_types: List[str] = []
+        self._action_timestamps: List[Any] = []
+        self._action_durations: List[Any] = []
+        self._action_params: List[Any] = []
+        self._action_success = bytearray()
+        self._action_errors: List[Any] = []
+        # Running failure counts so summaries need no extra pass
+        self._failed_actions = 0
+        self._failed_requests = 0
+        # HAR requests are kept column-wise; network_requests builds the dicts on demand
+        self._har_urls: List[Optional[str]] = []
+        self._har_methods: List[Optional[str]] = []
+        self._har_statuses: List[Optional[int]] = []
+        self._har_status_texts: List[Optional[str]] = []
+        self._har_durations: List[Optional[float]] = []
+        self._har_failures = bytearray()
         self.console_logs: List[str] = []
         self.errors: List[str] = []
 
     @classmethod
-    async def parse(cls, trace_path: str) -> 'PlaywrightTrace':
-        """Parse a Playwright trace file and return a PlaywrightTrace instance."""
+    async def parse(cls, trace_path: str, skip_har: bool = False) -> 'PlaywrightTrace':
+        """Parse a Playwright trace file and return a PlaywrightTrace instance.
+
+        With ``skip_har`` the network HAR is not read, leaving no network requests.
+        """
         trace = cls(trace_path)
-        await trace._parse_trace_file()
+        await trace._parse_trace_file(skip_har)
         return trace
 
-    async def _parse_trace_file(self):
+    async def _parse_trace_file(self, skip_har: bool = False):
         """Parse the trace.zip file and extract relevant information."""
-        if not self.trace_path.exists():
-            raise FileNotFoundError(f"Trace file not found: {self.trace_path}")
+        # Zip I/O and JSON decoding block, so keep them off the event loop
+        await asyncio.to_thread(self._parse_trace_sync, skip_har)
 
+    def _parse_trace_sync(self, skip_har: bool = False):
+        """Synchronous body of _parse_trace_file; populates self in place."""
         try:
-            with zipfile.ZipFile(self.trace_path, 'r') as zip_ref:
-                # List all files in the zip
-                files = zip_ref.namelist()
-                
-                # Parse trace files
-                for file in files:
-                    if file.endswith('.trace'):
-                        trace_data = zip_ref.read(file).decode('utf-8')
-                        for line in trace_data.split('\n'):
-                            if line.strip():
-                                try:
-                                    event = json.loads(line)
-                                    self._process_event(event)
-                                except json.JSONDecodeError:
-                                    self.errors.append(f"Failed to parse trace event: {line}")
-                
-                # Parse network HAR if available
-                har_files = [f for f in files if f.endswith('.har')]
-                if har_files:
-                    har_data = json.loads(zip_ref.read(har_files[0]).decode('utf-8'))
-                    self._process_har(har_data)
+            # Let the open report a missing file rather than stat-ing it first
+            try:
+                with _open_trace_zip(self.trace_path) as zip_ref:
+                    # List all files in the zip
+                    files = zip_ref.namelist()
+            except FileNotFoundError:
+                raise FileNotFoundError(f"Trace file not found: {self.trace_path}") from None
+
+            # Parse trace files, then the network HAR if available
+            jobs = [(PlaywrightTrace._parse_trace_member, f) for f in files if f.endswith('.trace')]
+            har_files = [] if skip_har else [f for f in files if f.endswith('.har')]
+            if har_files:
+                jobs.append((PlaywrightTrace._parse_har_member, har_files[0]))
+
+            if len(jobs) <= 1:
+                for parse, member in jobs:
+                    parse(self, member)
+                return
+
+            # Members decompress and decode independently, so overlap them on a pool.
+            # Results are merged in submission order to keep the output deterministic.
+            with ThreadPoolExecutor(max_workers=min(_MAX_MEMBER_WORKERS, len(jobs))) as pool:
+                futures = [pool.submit(self._parse_member_part, parse, member) for parse, member in jobs]
+                for future in futures:
+                    part = future.result()
+                    self._merge(part)
 
         except zipfile.BadZipFile:
             raise ValueError(f"Invalid trace file format: {self.trace_path}")
 
+    def _merge(self, part: 'PlaywrightTrace'):
+        """Append everything parsed into a partial trace."""
+        self._action_types.extend(part._action_types)
+        self._action_timestamps.extend(part._action_timestamps)
+        self._action_durations.extend(part._action_durations)
+        self._action_params.extend(part._action_params)
+        self._action_success.extend(part._action_success)
+        self._action_errors.extend(part._action_errors)
+        self._failed_actions += part._failed_actions
+        self._failed_requests += part._failed_requests
+        self._har_urls.extend(part._har_urls)
+        self._har_methods.extend(part._har_methods)
+        self._har_statuses.extend(part._har_statuses)
+        self._har_status_texts.extend(part._har_status_texts)
+        self._har_durations.extend(part._har_durations)
+        self._har_failures.extend(part._har_failures)
+        self.console_logs.extend(part.console_logs)
+        self.errors.extend(part.errors)
+
+    @property
+    def actions(self) -> List[Dict[str, Any]]:
+        """Recorded action events, one dict per event."""
+        return [
+            {
+                'type': action_type,
+                'timestamp': timestamp,
+                'duration': duration,
+                'params': params,
+                'success': bool(success),
+                'error': error
+            }
+            for action_type, timestamp, duration, params, success, error in zip(
+                self._action_types, self._action_timestamps, self._action_durations,
+                self._action_params, self._action_success, self._action_errors
+            )
+        ]
+
+    @property
+    def action_count(self) -> int:
+        """Number of recorded actions, without building the action dicts."""
+        return len(self._action_types)
+
+    @property
+    def failed_action_count(self) -> int:
+        """Number of actions not marked successful."""
+        return self._failed_actions
+
+    @property
+    def network_requests(self) -> List[Dict[str, Any]]:
+        """Network requests from the HAR, one dict per entry."""
+        return [
+            {
+                'url': url,
+                'method': method,
+                'status': status,
+                'statusText': status_text,
+                'duration': duration,  # in milliseconds
+                'failure': bool(failure)
+            }
+            for url, method, status, status_text, duration, failure in zip(
+                self._har_urls, self._har_methods, self._har_statuses,
+                self._har_status_texts, self._har_durations, self._har_failures
+            )
+        ]
+
+    @property
+    def request_count(self) -> int:
+        """Number of network requests, without building the request dicts."""
+        return len(self._har_urls)
+
+    @property
+    def failed_request_count(self) -> int:
+        """Number of requests with a status of 400 or above."""
+        return self._failed_requests
+
+    def _parse_member_part(self, parse, member: str) -> 'PlaywrightTrace':
+        """Parse one zip member into a fresh partial trace (run on a worker thread)."""
+        part = PlaywrightTrace(self.trace_path)
+        parse(part, member)
+        return part
+
+    def _parse_trace_member(self, member: str):
+        """Stream one .trace member line by line into this trace."""
+        # Each call opens its own handle; a ZipFile must not be shared across threads
+        with _open_trace_zip(self.trace_path) as zip_ref, \
+                zip_ref.open(member) as raw, \
+                io.BufferedReader(raw, buffer_size=_READ_BUFFER_SIZE) as buf:
+            # Hoist lookups out of the per-line loop
+            loads = _json_loads
+            decode_error = _JSONDecodeError
+            get_handler = _EVENT_HANDLERS.get
+            for line in buf:
+                # isspace() tests for blank lines without allocating a stripped copy
+                if not line.isspace():
+                    try:
+                        event = loads(line)
+                    except decode_error:
+                        line = line.rstrip(b'\r\n').decode('utf-8', 'replace')
+                        self.errors.append(f"Failed to parse trace event: {line}")
+                        continue
+                    # Same dispatch as _process_event, without the method call
+                    handler = get_handler(event.get('type'))
+                    if handler is not None:
+                        handler(self, event)
+
+    def _parse_har_member(self, member: str):
+        """Extract network requests from a .har member into this trace."""
+        with _open_trace_zip(self.trace_path) as zip_ref:
+            if ijson is not None:
+                # Stream entries so embedded response bodies never sit in memory together
+                with zip_ref.open(member) as har_file:
+                    self._process_har_entries(
+                        ijson.items(har_file, 'log.entries.item', use_float=True)
+                    )
+            else:
+                har_data = _json_loads(_read_member(zip_ref, member))
+                self._process_har(har_data)
+
     def _process_event(self, event: Dict[str, Any]):
         """Process a single trace event and categorize it."""
-        if 'type' not in event:
-            return
-
-        event_type = event['type']
-        
-        if event_type == 'before' or event_type == 'after':
-            # Handle action events
-            if 'method' in event and 'params' in event:
-                self.actions.append({
-                    'type': event['method'],
-                    'timestamp': event.get('timestamp', 0),
-                    'duration': event.get('duration', 0),
-                    'params': event['params'],
-                    'success': event_type == 'after' and 'error' not in event,
-                    'error': event.get('error')
-                })
-        elif event_type == 'console':
-            # Handle console messages
-            if 'text' in event:
-                self.console_logs.append(event['text'])
-        elif event_type == 'error':
-            # Handle error events
-            if 'error' in event:
-                self.errors.append(event['error'].get('message', str(event['error'])))
+        handler = _EVENT_HANDLERS.get(event.get('type'))
+        if handler is not None:
+            handler(self, event)
 
     def _process_har(self, har_data: Dict[str, Any]):
         """Process HAR data to extract network requests."""
         if 'log' in har_data and 'entries' in har_data['log']:
-            for entry in har_data['log']['entries']:
-                request = entry.get('request', {})
-                response = entry.get('response', {})
-                
-                self.network_requests.append({
-                    'url': request.get('url'),
-                    'method': request.get('method'),
-                    'status': response.get('status'),
-                    'statusText': response.get('statusText'),
-                    'duration': entry.get('time'),  # in milliseconds
-                    'failure': response.get('status', 0) >= 400
-                })
-
-async def analyze_trace(trace_path: str) -> dict:
-    """Parse a Playwright trace file and return structured data."""
-    trace = await PlaywrightTrace.parse(trace_path)
+            self._process_har_entries(har_data['log']['entries'])
+
+    def _process_har_entries(self, entries: Iterable[Dict[str, Any]]):
+        """Extract network requests from an iterable of HAR entries."""
+        # Entries may be a one-shot stream, so fill every column in one loop
+        # with the append methods bound once
+        append_url = self._har_urls.append
+        append_method = self._har_methods.append
+        append_status = self._har_statuses.append
+        append_status_text = self._har_status_texts.append
+        append_duration = self._har_durations.append
+        append_failure = self._har_failures.append
+        failed = 0
+        for entry in entries:
+            request = entry.get('request', {})
+            response = entry.get('response', {})
+            
+            append_url(request.get('url'))
+            append_method(request.get('method'))
+            append_status(response.get('status'))
+            append_status_text(response.get('statusText'))
+            append_duration(entry.get('time'))  # in milliseconds
+            failure = response.get('status', 0) >= 400
+            append_failure(failure)
+            failed += failure
+        self._failed_requests += failed
+
+def _h_action(trace: PlaywrightTrace, event: Dict[str, Any]):
+    """Record a 'before'/'after' action event."""
+    if 'method' in event and 'params' in event:
+        has_error = 'error' in event
+        trace._action_types.append(event['method'])
+        trace._action_timestamps.append(event.get('timestamp', 0))
+        trace._action_durations.append(event.get('duration', 0))
+        trace._action_params.append(event['params'])
+        success = not has_error and event['type'] == 'after'
+        trace._action_success.append(success)
+        if not success:
+            trace._failed_actions += 1
+        trace._action_errors.append(event['error'] if has_error else None)
+
+def _h_console(trace: PlaywrightTrace, event: Dict[str, Any]):
+    """Record a console message."""
+    if 'text' in event:
+        trace.console_logs.append(event['text'])
+
+def _h_error(trace: PlaywrightTrace, event: Dict[str, Any]):
+    """Record a page error."""
+    if 'error' in event:
+        error = event['error']
+        trace.errors.append(error.get('message', str(error)))
+
+# Event type -> handler, looked up once per event by PlaywrightTrace._process_event
+_EVENT_HANDLERS = {
+    'before': _h_action,
+    'after': _h_action,
+    'console': _h_console,
+    'error': _h_error,
+}
+
+# Per-step row builders shared by the analyze_* methods and analyze_all's
+# fused pass (EnhancedTraceAnalyzer._project_all)
+def _action_context_row(step: Dict[str, Any]) -> Dict[str, Any]:
+    step_context = step["action_context"]
+    return {
+        "step_id": step["step_id"],
+        "action": step["action"],
+        "target": step["target"],
+        "element_state": step_context["element_state"],
+        "viewport_state": step_context["viewport_state"]
+    }
+
+def _decision_trail_row(step: Dict[str, Any]) -> Dict[str, Any]:
+    element_state = step["action_context"]["element_state"]
+    return {
+        "step_id": step["step_id"],
+        "action": step["action"],
+        "confidence": element_state.get("confidence", 1.0),
+        "alternatives": element_state.get("alternatives", []),
+        "reasoning": element_state.get("reasoning", [])
+    }
+
+def _element_identification_row(step: Dict[str, Any]) -> Dict[str, Any]:
+    element_state = step["action_context"]["element_state"]
+    return {
+        "step_id": step["step_id"],
+        "target": step["target"],
+        "selector": element_state.get("selector", ""),
+        "position": element_state.get("position", {}),
+        "relationships": element_state.get("relationships", {})
+    }
+
+def _model_data_row(step: Dict[str, Any]) -> Dict[str, Any]:
+    element_state = step["action_context"]["element_state"]
+    return {
+        "step_id": step["step_id"],
+        "action": step["action"],
+        "model_info": element_state.get("model_info", {}),
+        "vision_analysis": element_state.get("vision_analysis", {})
+    }
+
+def _temporal_context_row(step: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "step_id": step["step_id"],
+        "timing": step["timing"],
+        "wait_conditions": step["action_context"]["element_state"].get("wait_conditions", [])
+    }
+
+def _element_reporting_row(step: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "step_id": step["step_id"],
+        "action": step["action"],
+        "target": step["target"],
+        "element_state": step["action_context"]["element_state"],
+        "status": step["status"]
+    }
+
+def _timing_row(step: Dict[str, Any]) -> Dict[str, Any]:
+    step_timing = step["timing"]
     return {
-        "actions": trace.actions,
-        "network_requests": trace.network_requests,
-        "console_logs": trace.console_logs,
-        "errors": trace.errors,
-        "summary": {
-            "total_actions": len(trace.actions),
-            "failed_actions": sum(1 for a in trace.actions if not a['success']),
-            "total_requests": len(trace.network_requests),
-            "failed_requests": sum(1 for r in trace.network_requests if r.get('failure')),
-            "total_errors": len(trace.errors),
-            "error_summary": "\n".join(trace.errors) if trace.errors else "No errors"
+        "step_id": step["step_id"],
+        "action": step["action"],
+        "timing": {
+            "start": step_timing["start"],
+            "end": step_timing["end"],
+            "duration": step_timing["duration"]
         }
     }
 
+def _visual_changes_row(step: Dict[str, Any]) -> Dict[str, Any]:
+    visual_state = step.get("visual_state", {})
+    screenshot_diffs = visual_state.get("screenshot_diffs", {})
+    element_visibility = visual_state.get("element_visibility", {})
+    return {
+        "step_id": step["step_id"],
+        "before_action": {
+            "screenshot": screenshot_diffs.get("before"),
+            "visible_elements": element_visibility.get("before", [])
+        },
+        "after_action": {
+            "screenshot": screenshot_diffs.get("after"),
+            "visible_elements": element_visibility.get("after", []),
+            "added_elements": element_visibility.get("added", []),
+            "removed_elements": element_visibility.get("removed", [])
+        },
+        "layout_shifts": visual_state.get("layout_shifts", [])
+    }
+
+# _project_all row list -> builder applied to every step (timing rows are
+# only built for timed steps)
+_STEP_ROWS = {
+    "action_context": _action_context_row,
+    "decision_trail": _decision_trail_row,
+    "element_identification": _element_identification_row,
+    "model_data": _model_data_row,
+    "temporal_context": _temporal_context_row,
+    "element_reporting": _element_reporting_row,
+    "visual_changes": _visual_changes_row,
+}
+
+async def analyze_trace(trace_path: str, sections: frozenset = TRACE_SECTIONS) -> dict:
+    """Parse a Playwright trace file and return structured data.
+
+    Args:
+        trace_path: Path to the trace zip.
+        sections: Subset of TRACE_SECTIONS to include. Leaving out "network"
+            also skips reading the HAR, which is often most of the archive.
+    """
+    unknown = set(sections) - TRACE_SECTIONS
+    if unknown:
+        raise ValueError(f"Unknown trace sections: {', '.join(sorted(unknown))}")
+
+    trace = await PlaywrightTrace.parse(trace_path, skip_har="network" not in sections)
+    result: Dict[str, Any] = {}
+    summary: Dict[str, Any] = {}
+    if "actions" in sections:
+        result["actions"] = trace.actions
+    if "network" in sections:
+        result["network_requests"] = trace.network_requests
+    if "console" in sections:
+        result["console_logs"] = trace.console_logs
+    if "errors" in sections:
+        result["errors"] = trace.errors
+
+    if "actions" in sections:
+        summary["total_actions"] = trace.action_count
+        summary["failed_actions"] = trace.failed_action_count
+    if "network" in sections:
+        summary["total_requests"] = trace.request_count
+        summary["failed_requests"] = trace.failed_request_count
+    if "errors" in sections:
+        summary["total_errors"] = len(trace.errors)
+        summary["error_summary"] = "\n".join(trace.errors) if trace.errors else "No errors"
+    result["summary"] = summary
+    return result
+
 if __name__ == "__main__":
     # Example usage
     async def main():
@@ -149,6 +522,11 @@ class EnhancedTraceAnalyzer:
         """
         self.trace_file_path = trace_file_path
         self._trace_data: Optional[Dict[str, Any]] = None
+        self._resolved_trace_path: Optional[Path] = None
+        # Derived from the loaded trace data; each holds (trace_data, value) so a
+        # hit is an identity match, and both are dropped whenever data is loaded
+        self._projection_cache: Optional[Tuple[Dict[str, Any], Dict[str, Any]]] = None
+        self._analysis_cache: Optional[Tuple[Dict[str, Any], "LazyAnalysisResult"]] = None
 
     async def _load_trace_data(self) -> Dict[str, Any]:
         """Load and validate enhanced trace data from the trace file.
@@ -160,76 +538,103 @@ class EnhancedTraceAnalyzer:
             ValueError: If the trace file is invalid or cannot be parsed.
         """
         if self._trace_data is None:
-            try:
-                trace_path = Path(self.trace_file_path)
-                
-                # Handle nested directory structure
-                if trace_path.is_dir():
-                    trace_zip = trace_path / 'trace.zip'
-                    if trace_zip.is_dir():
-                        trace_files = list(trace_zip.glob('*.zip'))
-                        if not trace_files:
-                            raise ValueError("No trace files found")
-                        trace_path = trace_files[0]
-                    else:
-                        raise ValueError("Invalid trace directory structure")
-                
-                # Parse Playwright trace
-                with zipfile.ZipFile(trace_path) as zf:
-                    # Load trace data
-                    with zf.open('trace.trace') as f:
-                        trace_events = []
-                        for line in f.read().decode('utf-8').splitlines():
-                            if line.strip():
-                                trace_events.append(json.loads(line))
-                    
-                    # Load network data
-                    with zf.open('trace.network') as f:
-                        network_events = []
-                        for line in f.read().decode('utf-8').splitlines():
-                            if line.strip():
-                                network_events.append(json.loads(line))
-                    
-                    # Convert to enhanced trace format
-                    self._trace_data = self._convert_playwright_trace(trace_events, network_events)
-                
-            except Exception as e:
-                raise ValueError(f"Failed to load trace data: {str(e)}")
+            # Zip I/O and JSON decoding block, so keep them off the event loop
+            self._projection_cache = self._analysis_cache = None
+            self._trace_data = await asyncio.to_thread(self._load_sync)
         
         return self._trace_data
 
+    def _load_sync(self) -> Dict[str, Any]:
+        """Synchronous body of _load_trace_data; returns the converted trace."""
+        try:
+            trace_path = self._resolve_trace_path()
+            
+            # Parse Playwright trace
+            with _open_trace_zip(trace_path) as zf:
+                # Load trace data
+                with zf.open('trace.trace') as raw, io.BufferedReader(raw, buffer_size=_READ_BUFFER_SIZE) as f:
+                    trace_events = list(self._iter_json_lines(f))
+                
+                # Load network data
+                with zf.open('trace.network') as raw, io.BufferedReader(raw, buffer_size=_READ_BUFFER_SIZE) as f:
+                    # Only response events are used, so skip decoding the rest
+                    network_events = list(self._iter_json_lines(f, _RESPONSE_RECEIVED_NEEDLE))
+                
+                # Convert to enhanced trace format
+                return self._convert_playwright_trace(trace_events, network_events)
+            
+        except Exception as e:
+            raise ValueError(f"Failed to load trace data: {str(e)}")
+
+    def _resolve_trace_path(self) -> Path:
+        """Locate the trace zip, following the nested directory layout.
+
+        The result is cached so reloading the trace repeats none of the stats.
+        """
+        if self._resolved_trace_path is None:
+            trace_path = Path(self.trace_file_path)
+            try:
+                is_dir = stat.S_ISDIR(trace_path.stat().st_mode)
+            except OSError:
+                is_dir = False
+            
+            # Handle nested directory structure
+            if is_dir:
+                trace_zip = trace_path / 'trace.zip'
+                if trace_zip.is_dir():
+                    trace_files = list(trace_zip.glob('*.zip'))
+                    if not trace_files:
+                        raise ValueError("No trace files found")
+                    trace_path = trace_files[0]
+                else:
+                    raise ValueError("Invalid trace directory structure")
+            self._resolved_trace_path = trace_path
+        return self._resolved_trace_path
+
+    @staticmethod
+    def _iter_json_lines(f, needle: Optional[bytes] = None) -> Iterator[Dict[str, Any]]:
+        """Yield one decoded event per line of a JSON-lines zip member.
+
+        The member is read incrementally, so only a single line is held in
+        memory at a time rather than the whole decompressed file. When
+        ``needle`` is given, lines not containing it are skipped undecoded.
+        """
+        loads = _json_loads
+        for line in f:
+            if needle is not None and needle not in line:
+                continue
+            if not line.isspace():
+                yield loads(line)
+
     def _convert_playwright_trace(self, trace_events: List[Dict[str, Any]], network_events: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Convert Playwright trace format to enhanced trace format."""
-        # Extract metadata
-        metadata = {
-            "session_id": trace_events[0].get('sessionId', 'unknown'),
-            "timestamp": trace_events[0].get('timestamp', 0),
-            "browser_info": {
-                "viewport": next(
-                    (e.get('params', {}).get('viewport') for e in trace_events 
-                     if e.get('method') == 'setViewportSize'),
-                    {"width": 0, "height": 0}
-                ),
-                "user_agent": next(
-                    (e.get('params', {}).get('userAgent') for e in trace_events 
-                     if e.get('method') == 'setUserAgent'),
-                    "unknown"
-                )
-            }
-        }
+        """Convert Playwright trace format to enhanced trace format.
+
+        Steps and the first occurrence of each metadata/performance event are
+        collected in a single pass over the trace events.
+        """
+        first_event = trace_events[0]
+        viewport = None
+        user_agent = None
+        dom_complete = None
+        load_complete = None
+        first_interaction = None
 
         # Extract steps
         steps = []
         current_step = None
         
         for event in trace_events:
-            if event.get('type') == 'before':
+            event_type = event.get('type')
+            method = event.get('method')
+
+            if event_type == 'before':
                 if current_step:
                     steps.append(current_step)
+                params = event.get('params', {})
                 current_step = {
                     "step_id": len(steps) + 1,
                     "action": event.get('method', 'unknown'),
-                    "target": event.get('params', {}).get('selector', ''),
+                    "target": params.get('selector', ''),
                     "timing": {
                         "start": event.get('timestamp', 0),
                         "end": None,
@@ -243,26 +648,61 @@ class EnhancedTraceAnalyzer:
                         "layout_shifts": []
                     },
                     "action_context": {
-                        "element_state": event.get('params', {}),
-                        "viewport_state": metadata['browser_info']['viewport']
+                        "element_state": params,
+                        # Filled in once the viewport event has been seen
+                        "viewport_state": None
                     }
                 }
-            elif event.get('type') == 'after' and current_step:
-                current_step['timing']['end'] = event.get('timestamp', 0)
-                current_step['timing']['duration'] = (
-                    current_step['timing']['end'] - current_step['timing']['start']
-                )
-                current_step['status'] = 'error' if 'error' in event else 'success'
+                if first_interaction is None and method in ('click', 'fill'):
+                    first_interaction = event.get('timestamp', 0)
+            elif event_type == 'after' and current_step:
+                timing = current_step['timing']
+                timing['end'] = event.get('timestamp', 0)
+                timing['duration'] = timing['end'] - timing['start']
                 if 'error' in event:
+                    error = event['error']
+                    current_step['status'] = 'error'
                     current_step['error_context'] = {
-                        "error_type": event['error'].get('name', 'unknown'),
-                        "message": event['error'].get('message', ''),
-                        "stack": event['error'].get('stack', '')
+                        "error_type": error.get('name', 'unknown'),
+                        "message": error.get('message', ''),
+                        "stack": error.get('stack', '')
                     }
+                else:
+                    current_step['status'] = 'success'
+
+            if method is None:
+                continue
+            if method == 'setViewportSize':
+                if viewport is None:
+                    viewport = event.get('params', {}).get('viewport')
+            elif method == 'setUserAgent':
+                if user_agent is None:
+                    user_agent = event.get('params', {}).get('userAgent')
+            elif method == 'domcontentloaded':
+                if dom_complete is None:
+                    dom_complete = event.get('timestamp', 0)
+            elif method == 'load':
+                if load_complete is None:
+                    load_complete = event.get('timestamp', 0)
 
         if current_step:
             steps.append(current_step)
 
+        if viewport is None:
+            viewport = {"width": 0, "height": 0}
+        for step in steps:
+            step['action_context']['viewport_state'] = viewport
+
+        # Extract metadata
+        metadata = {
+            "session_id": first_event.get('sessionId', 'unknown'),
+            "timestamp": first_event.get('timestamp', 0),
+            "browser_info": {
+                "viewport": viewport,
+                "user_agent": "unknown" if user_agent is None else user_agent
+            }
+        }
+
         # Add network information
         network_info = {
             "requests": [
@@ -277,96 +717,90 @@ class EnhancedTraceAnalyzer:
             ]
         }
 
+        timed_durations = [
+            step['timing']['duration'] for step in steps
+            if step['timing']['duration'] is not None
+        ]
+
         return {
             "metadata": metadata,
             "steps": steps,
             "network": network_info,
             "performance": {
                 "navigation_timing": {
-                    "dom_complete": next(
-                        (e.get('timestamp', 0) for e in trace_events 
-                         if e.get('method') == 'domcontentloaded'),
-                        0
-                    ),
-                    "load_complete": next(
-                        (e.get('timestamp', 0) for e in trace_events 
-                         if e.get('method') == 'load'),
-                        0
-                    )
+                    "dom_complete": dom_complete or 0,
+                    "load_complete": load_complete or 0
                 },
                 "interaction_timing": {
-                    "time_to_first_interaction": next(
-                        (e.get('timestamp', 0) for e in trace_events 
-                         if e.get('type') == 'before' and e.get('method') in ['click', 'fill']),
-                        0
-                    ) - metadata['timestamp'],
-                    "action_latency": sum(
-                        step['timing']['duration'] for step in steps 
-                        if step['timing']['duration'] is not None
-                    ) / len(steps) if steps else 0
+                    "time_to_first_interaction": (first_interaction or 0) - metadata['timestamp'],
+                    "action_latency": sum(timed_durations) / len(steps) if steps else 0
                 }
             }
         }
 
+    def _projections(self, trace_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Step subsets shared by several analyses, computed once per loaded trace."""
+        cache = self._projection_cache
+        if cache is not None and cache[0] is trace_data:
+            return cache[1]
+        steps = trace_data.get("steps", [])
+        timed_steps = [step for step in steps if step["timing"]["duration"] is not None]
+        projections = {
+            "error_steps": [step for step in steps if step.get("status") == "error"],
+            "timed_steps": timed_steps,
+            "total_duration": sum(step["timing"]["duration"] for step in timed_steps),
+        }
+        # Only the analyzer's own data is cached; other dicts may change under us
+        if trace_data is self._trace_data:
+            self._projection_cache = (trace_data, projections)
+        return projections
+
+    def _project_all(self, trace_data: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+        """Per-step rows for every step-wise analysis, built in a single pass.
+
+        Used by analyze_all; the individual analyze_* methods build the same
+        rows through the shared _*_row helpers.
+        """
+        rows: Dict[str, List[Dict[str, Any]]] = {name: [] for name in _STEP_ROWS}
+        appenders = [(rows[name].append, build) for name, build in _STEP_ROWS.items()]
+        timing = rows["timing"] = []
+
+        for step in trace_data["steps"]:
+            for append, build in appenders:
+                append(build(step))
+            if step["timing"]["duration"] is not None:
+                timing.append(_timing_row(step))
+
+        return rows
+
     async def analyze_action_context(self) -> Dict[str, Any]:
         """Analyze the context of actions including before/after states."""
-        trace_data = await self._load_trace_data()
-        steps = trace_data["steps"]
-        
-        return {
-            "steps": [
-                {
-                    "step_id": step["step_id"],
-                    "action": step["action"],
-                    "target": step["target"],
-                    "element_state": step["action_context"]["element_state"],
-                    "viewport_state": step["action_context"]["viewport_state"]
-                }
-                for step in steps
-            ]
-        }
+        return self._analyze_action_context(await self._load_trace_data())
+
+    def _analyze_action_context(self, trace_data: Dict[str, Any]) -> Dict[str, Any]:
+        return {"steps": [_action_context_row(step) for step in trace_data["steps"]]}
 
     async def analyze_decision_trail(self) -> Dict[str, Any]:
         """Analyze the decision making process and alternatives considered."""
-        trace_data = await self._load_trace_data()
-        steps = trace_data["steps"]
-        
-        return {
-            "steps": [
-                {
-                    "step_id": step["step_id"],
-                    "action": step["action"],
-                    "confidence": step["action_context"]["element_state"].get("confidence", 1.0),
-                    "alternatives": step["action_context"]["element_state"].get("alternatives", []),
-                    "reasoning": step["action_context"]["element_state"].get("reasoning", [])
-                }
-                for step in steps
-            ]
-        }
+        return self._analyze_decision_trail(await self._load_trace_data())
+
+    def _analyze_decision_trail(self, trace_data: Dict[str, Any]) -> Dict[str, Any]:
+        return {"steps": [_decision_trail_row(step) for step in trace_data["steps"]]}
 
     async def analyze_element_identification(self) -> Dict[str, Any]:
         """Analyze methods used to identify elements."""
-        trace_data = await self._load_trace_data()
-        steps = trace_data["steps"]
-        
-        return {
-            "steps": [
-                {
-                    "step_id": step["step_id"],
-                    "target": step["target"],
-                    "selector": step["action_context"]["element_state"].get("selector", ""),
-                    "position": step["action_context"]["element_state"].get("position", {}),
-                    "relationships": step["action_context"]["element_state"].get("relationships", {})
-                }
-                for step in steps
-            ]
-        }
+        return self._analyze_element_identification(await self._load_trace_data())
+
+    def _analyze_element_identification(self, trace_data: Dict[str, Any]) -> Dict[str, Any]:
+        return {"steps": [_element_identification_row(step) for step in trace_data["steps"]]}
 
     async def analyze_failures(self) -> Dict[str, Any]:
         """Analyze failure scenarios and recovery attempts."""
-        trace_data = await self._load_trace_data()
+        return self._analyze_failures(await self._load_trace_data())
+
+    def _analyze_failures(self, trace_data: Dict[str, Any]) -> Dict[str, Any]:
         steps = trace_data["steps"]
-        failed_steps = [step for step in steps if step["status"] == "error"]
+        failed_steps = self._projections(trace_data)["error_steps"]
         
         return {
             "failed_steps": [
@@ -384,7 +818,9 @@ class EnhancedTraceAnalyzer:
 
     async def analyze_session_context(self) -> Dict[str, Any]:
         """Analyze session-wide context including navigation and network activity."""
-        trace_data = await self._load_trace_data()
+        return self._analyze_session_context(await self._load_trace_data())
+
+    def _analyze_session_context(self, trace_data: Dict[str, Any]) -> Dict[str, Any]:
         
         return {
             "metadata": trace_data["metadata"],
@@ -394,88 +830,57 @@ class EnhancedTraceAnalyzer:
 
     async def analyze_recovery_info(self) -> Dict[str, Any]:
         """Analyze recovery information and checkpoints."""
-        trace_data = await self._load_trace_data()
-        steps = trace_data["steps"]
-        recovery_steps = [
-            step for step in steps 
-            if step["status"] == "error" and step["action_context"]["element_state"].get("recovery_attempts")
-        ]
+        return self._analyze_recovery_info(await self._load_trace_data())
+
+    def _analyze_recovery_info(self, trace_data: Dict[str, Any]) -> Dict[str, Any]:
+        recovery_steps = []
+        for step in self._projections(trace_data)["error_steps"]:
+            recovery_attempts = step["action_context"]["element_state"].get("recovery_attempts")
+            if not recovery_attempts:
+                continue
+            recovery_steps.append({
+                "step_id": step["step_id"],
+                "action": step["action"],
+                "recovery_attempts": recovery_attempts,
+                "final_status": "recovered" if any(
+                    attempt.get("success") 
+                    for attempt in recovery_attempts
+                ) else "failed"
+            })
         
-        return {
-            "recovery_steps": [
-                {
-                    "step_id": step["step_id"],
-                    "action": step["action"],
-                    "recovery_attempts": step["action_context"]["element_state"]["recovery_attempts"],
-                    "final_status": "recovered" if any(
-                        attempt.get("success") 
-                        for attempt in step["action_context"]["element_state"].get("recovery_attempts", [])
-                    ) else "failed"
-                }
-                for step in recovery_steps
-            ]
-        }
+        return {"recovery_steps": recovery_steps}
 
     async def analyze_model_data(self) -> Dict[str, Any]:
         """Analyze model-specific data including token usage and vision analysis."""
-        trace_data = await self._load_trace_data()
-        steps = trace_data["steps"]
-        
-        return {
-            "steps": [
-                {
-                    "step_id": step["step_id"],
-                    "action": step["action"],
-                    "model_info": step["action_context"]["element_state"].get("model_info", {}),
-                    "vision_analysis": step["action_context"]["element_state"].get("vision_analysis", {})
-                }
-                for step in steps
-            ]
-        }
+        return self._analyze_model_data(await self._load_trace_data())
+
+    def _analyze_model_data(self, trace_data: Dict[str, Any]) -> Dict[str, Any]:
+        return {"steps": [_model_data_row(step) for step in trace_data["steps"]]}
 
     async def analyze_temporal_context(self) -> Dict[str, Any]:
         """Analyze temporal information including timing and wait conditions."""
-        trace_data = await self._load_trace_data()
-        steps = trace_data["steps"]
-        
+        return self._analyze_temporal_context(await self._load_trace_data())
+
+    def _analyze_temporal_context(self, trace_data: Dict[str, Any]) -> Dict[str, Any]:
         return {
-            "steps": [
-                {
-                    "step_id": step["step_id"],
-                    "timing": step["timing"],
-                    "wait_conditions": step["action_context"]["element_state"].get("wait_conditions", [])
-                }
-                for step in steps
-            ],
-            "total_duration": sum(
-                step["timing"]["duration"] for step in steps 
-                if step["timing"]["duration"] is not None
-            )
+            "steps": [_temporal_context_row(step) for step in trace_data["steps"]],
+            "total_duration": self._projections(trace_data)["total_duration"]
         }
 
     async def analyze_element_reporting(self) -> Dict[str, Any]:
         """Analyze enhanced element reporting with detailed selection context."""
-        trace_data = await self._load_trace_data()
-        steps = trace_data["steps"]
-        
-        return {
-            "steps": [
-                {
-                    "step_id": step["step_id"],
-                    "action": step["action"],
-                    "target": step["target"],
-                    "element_state": step["action_context"]["element_state"],
-                    "status": step["status"]
-                }
-                for step in steps
-            ]
-        }
+        return self._analyze_element_reporting(await self._load_trace_data())
+
+    def _analyze_element_reporting(self, trace_data: Dict[str, Any]) -> Dict[str, Any]:
+        return {"steps": [_element_reporting_row(step) for step in trace_data["steps"]]}
 
     async def analyze_error_context(self) -> Dict[str, Any]:
         """Analyze error context and session state information."""
-        trace_data = await self._load_trace_data()
+        return self._analyze_error_context(await self._load_trace_data())
+
+    def _analyze_error_context(self, trace_data: Dict[str, Any]) -> Dict[str, Any]:
         steps = trace_data["steps"]
-        error_steps = [step for step in steps if step["status"] == "error"]
+        error_steps = self._projections(trace_data)["error_steps"]
         
         return {
             "error_steps": [
@@ -498,58 +903,27 @@ class EnhancedTraceAnalyzer:
 
     async def analyze_timing(self) -> Dict[str, Any]:
         """Analyze detailed interaction timing information."""
-        trace_data = await self._load_trace_data()
-        steps = trace_data["steps"]
+        return self._analyze_timing(await self._load_trace_data())
+
+    def _analyze_timing(self, trace_data: Dict[str, Any]) -> Dict[str, Any]:
+        projections = self._projections(trace_data)
+        timed_steps = projections["timed_steps"]
         
         return {
-            "steps": [
-                {
-                    "step_id": step["step_id"],
-                    "action": step["action"],
-                    "timing": {
-                        "start": step["timing"]["start"],
-                        "end": step["timing"]["end"],
-                        "duration": step["timing"]["duration"]
-                    }
-                }
-                for step in steps
-                if step["timing"]["duration"] is not None
-            ],
+            "steps": [_timing_row(step) for step in timed_steps],
             "performance": trace_data["performance"],
             "summary": {
-                "total_duration": sum(
-                    step["timing"]["duration"] for step in steps 
-                    if step["timing"]["duration"] is not None
-                ),
-                "average_step_duration": sum(
-                    step["timing"]["duration"] for step in steps 
-                    if step["timing"]["duration"] is not None
-                ) / len([s for s in steps if s["timing"]["duration"] is not None])
+                "total_duration": projections["total_duration"],
+                "average_step_duration": projections["total_duration"] / len(timed_steps)
             }
         }
 
     async def analyze_visual_state(self) -> Dict[str, Any]:
         """Analyze visual state changes with enhanced tracking."""
-        trace_data = await self._load_trace_data()
-        steps = trace_data.get("steps", [])
-        
-        visual_analysis = []
-        for step in steps:
-            visual_state = step.get("visual_state", {})
-            visual_analysis.append({
-                "step_id": step["step_id"],
-                "before_action": {
-                    "screenshot": visual_state.get("screenshot_diffs", {}).get("before"),
-                    "visible_elements": visual_state.get("element_visibility", {}).get("before", [])
-                },
-                "after_action": {
-                    "screenshot": visual_state.get("screenshot_diffs", {}).get("after"),
-                    "visible_elements": visual_state.get("element_visibility", {}).get("after", []),
-                    "added_elements": visual_state.get("element_visibility", {}).get("added", []),
-                    "removed_elements": visual_state.get("element_visibility", {}).get("removed", [])
-                },
-                "layout_shifts": visual_state.get("layout_shifts", [])
-            })
+        return self._analyze_visual_state(await self._load_trace_data())
+
+    def _analyze_visual_state(self, trace_data: Dict[str, Any]) -> Dict[str, Any]:
+        visual_analysis = [_visual_changes_row(step) for step in trace_data.get("steps", [])]
         
         return {
             "visual_changes": visual_analysis,
@@ -562,9 +936,10 @@ class EnhancedTraceAnalyzer:
 
     async def analyze_error_recovery(self) -> Dict[str, Any]:
         """Analyze enhanced error recovery capabilities with improved context."""
-        trace_data = await self._load_trace_data()
-        steps = trace_data.get("steps", [])
-        error_steps = [step for step in steps if step.get("status") == "error"]
+        return self._analyze_error_recovery(await self._load_trace_data())
+
+    def _analyze_error_recovery(self, trace_data: Dict[str, Any]) -> Dict[str, Any]:
+        error_steps = self._projections(trace_data)["error_steps"]
         
         recovery_analysis = []
         for step in error_steps:
@@ -589,24 +964,37 @@ class EnhancedTraceAnalyzer:
 
     async def analyze_performance(self) -> Dict[str, Any]:
         """Analyze performance metrics including navigation and interaction timing."""
-        trace_data = await self._load_trace_data()
+        return self._analyze_performance(await self._load_trace_data())
+
+    def _analyze_performance(self, trace_data: Dict[str, Any]) -> Dict[str, Any]:
         performance = trace_data.get("performance", {})
+        steps = trace_data.get("steps", [])
+        projections = self._projections(trace_data)
+        if len(projections["timed_steps"]) == len(steps):
+            # Every step has a duration, so the shared total is the same sum
+            total_interaction_time = projections["total_duration"]
+        else:
+            total_interaction_time = sum(
+                step.get("timing", {}).get("duration", 0) 
+                for step in steps
+            )
         
         return {
             "navigation_timing": performance.get("navigation_timing", {}),
             "interaction_timing": performance.get("interaction_timing", {}),
             "metrics_summary": {
                 "avg_action_latency": performance.get("interaction_timing", {}).get("action_latency", 0),
-                "total_interaction_time": sum(
-                    step.get("timing", {}).get("duration", 0) 
-                    for step in trace_data.get("steps", [])
-                )
+                "total_interaction_time": total_interaction_time
             }
         }
 
-    async def analyze_all(self) -> Dict[str, Any]:
+    async def analyze_all(self, sections: Optional[Iterable[str]] = None) -> Dict[str, Any]:
         """Perform comprehensive analysis of all trace components.
         
+        Args:
+            sections: Optional subset of component names to include; the others
+                are not computed.
+        
         Returns:
             Dict containing analysis results from all components:
             - action_context: Action and element state analysis
@@ -624,21 +1012,140 @@ class EnhancedTraceAnalyzer:
             - error_recovery: Enhanced error recovery capabilities
             - performance: Performance metrics and timing analysis
         """
+        return (await self.analyze_lazy(sections)).to_dict()
+
+    async def analyze_lazy(self, sections: Optional[Iterable[str]] = None) -> 'LazyAnalysisResult':
+        """Like analyze_all, but compute each component only when it is first read.
+        
+        The trace is loaded up front. Use ``to_dict()`` on the returned mapping
+        to get the plain dict analyze_all returns.
+        
+        Args:
+            sections: Optional subset of component names to expose; the others
+                are never computed, even by ``to_dict()``.
+        """
         trace_data = await self._load_trace_data()
+        cache = self._analysis_cache
+        if cache is not None and cache[0] is trace_data:
+            cached = cache[1]
+        else:
+            cached = LazyAnalysisResult(self, trace_data)
+            self._analysis_cache = (trace_data, cached)
+        if sections is not None:
+            return cached.restrict(sections)
+        return cached
+
+    def _analyze_all(self, trace_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Compute every component at once, sharing the fused step pass."""
+        rows = self._project_all(trace_data)
+        projections = self._projections(trace_data)
+        visual_changes = rows["visual_changes"]
         
-        return {
-            "action_context": await self.analyze_action_context(),
-            "decision_trail": await self.analyze_decision_trail(),
-            "element_identification": await self.analyze_element_identification(),
-            "failure_analysis": await self.analyze_failures(),
-            "session_context": await self.analyze_session_context(),
-            "recovery_info": await self.analyze_recovery_info(),
-            "model_data": await self.analyze_model_data(),
-            "temporal_context": await self.analyze_temporal_context(),
-            "element_reporting": await self.analyze_element_reporting(),
-            "error_context": await self.analyze_error_context(),
-            "timing_analysis": await self.analyze_timing(),
-            "visual_state": await self.analyze_visual_state(),
-            "error_recovery": await self.analyze_error_recovery(),
-            "performance": await self.analyze_performance()
-        } 
\ No newline at end of file
+        result = {
+            "action_context": {"steps": rows["action_context"]},
+            "decision_trail": {"steps": rows["decision_trail"]},
+            "element_identification": {"steps": rows["element_identification"]},
+            "failure_analysis": self._analyze_failures(trace_data),
+            "session_context": self._analyze_session_context(trace_data),
+            "recovery_info": self._analyze_recovery_info(trace_data),
+            "model_data": {"steps": rows["model_data"]},
+            "temporal_context": {
+                "steps": rows["temporal_context"],
+                "total_duration": projections["total_duration"]
+            },
+            "element_reporting": {"steps": rows["element_reporting"]},
+            "error_context": self._analyze_error_context(trace_data),
+            "timing_analysis": {
+                "steps": rows["timing"],
+                "performance": trace_data["performance"],
+                "summary": {
+                    "total_duration": projections["total_duration"],
+                    "average_step_duration": projections["total_duration"] / len(projections["timed_steps"])
+                }
+            },
+            "visual_state": {
+                "visual_changes": visual_changes,
+                "cumulative_layout_shift": sum(
+                    shift.get("cumulative_layout_shift", 0)
+                    for step in visual_changes
+                    for shift in step["layout_shifts"]
+                )
+            },
+            "error_recovery": self._analyze_error_recovery(trace_data),
+            "performance": self._analyze_performance(trace_data)
+        }
+        return result
+
+
+# analyze_all component name -> EnhancedTraceAnalyzer method computing it
+_ANALYSES = {
+    "action_context": "_analyze_action_context",
+    "decision_trail": "_analyze_decision_trail",
+    "element_identification": "_analyze_element_identification",
+    "failure_analysis": "_analyze_failures",
+    "session_context": "_analyze_session_context",
+    "recovery_info": "_analyze_recovery_info",
+    "model_data": "_analyze_model_data",
+    "temporal_context": "_analyze_temporal_context",
+    "element_reporting": "_analyze_element_reporting",
+    "error_context": "_analyze_error_context",
+    "timing_analysis": "_analyze_timing",
+    "visual_state": "_analyze_visual_state",
+    "error_recovery": "_analyze_error_recovery",
+    "performance": "_analyze_performance",
+}
+
+class LazyAnalysisResult(Mapping):
+    """Result of EnhancedTraceAnalyzer.analyze_lazy.
+    
+    Components are computed from the already-loaded trace data the first time
+    they are accessed and cached afterwards.
+    """
+
+    def __init__(self, analyzer: EnhancedTraceAnalyzer, trace_data: Dict[str, Any],
+                 keys: Optional[List[str]] = None, cache: Optional[Dict[str, Any]] = None):
+        self._analyzer = analyzer
+        self._trace_data = trace_data
+        self._keys = list(_ANALYSES) if keys is None else keys
+        self._cache: Dict[str, Any] = {} if cache is None else cache
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return self._cache[key]
+        except KeyError:
+            pass
+        if key not in self:
+            raise KeyError(key)
+        method_name = _ANALYSES[key]
+        value = self._cache[key] = getattr(self._analyzer, method_name)(self._trace_data)
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        # Membership must not trigger the computation
+        return key in self._keys
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __repr__(self) -> str:
+        return f"LazyAnalysisResult(computed={[key for key in self._keys if key in self._cache]})"
+
+    def restrict(self, sections: Iterable[str]) -> 'LazyAnalysisResult':
+        """View limited to ``sections``, sharing already computed components."""
+        sections = set(sections)
+        unknown = sections - _ANALYSES.keys()
+        if unknown:
+            raise ValueError(f"Unknown analysis sections: {', '.join(sorted(unknown))}")
+        keys = [key for key in _ANALYSES if key in sections]
+        return LazyAnalysisResult(self._analyzer, self._trace_data, keys, self._cache)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return every component as a plain dict, computing any still missing."""
+        missing = [key for key in self._keys if key not in self._cache]
+        if len(missing) == len(_ANALYSES):
+            # Nothing computed yet: share one fused pass over the steps
+            self._cache.update(self._analyzer._analyze_all(self._trace_data))
+        return {key: self[key] for key in self._keys}
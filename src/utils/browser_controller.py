@@ -1,68 +1,92 @@
-from typing import Optional, Any
+from typing import List, Optional, Any, Tuple
 import asyncio
-from playwright.async_api import async_playwright, Browser, Playwright
+import os
+from playwright.async_api import async_playwright, Browser, BrowserContext, Playwright
 from .structured_logging import StructuredLogger, setup_structured_logging
 
+def _pool_size() -> int:
+    """Number of warm browsers to launch, from BROWSER_POOL_SIZE (default 1)."""
+    try:
+        return max(1, int(os.getenv("BROWSER_POOL_SIZE", "1")))
+    except ValueError:
+        return 1
+
 class BrowserController:
     def __init__(self):
+        # First pooled browser, kept for callers that use a single browser
         self.browser: Optional[Browser] = None
-        self.init_promise: Optional[asyncio.Task] = None
+        self._browsers: List[Browser] = []
+        self._pool: Optional[asyncio.Queue] = None
+        # Set once per initialization; done when the browsers are ready
+        self._ready: Optional[asyncio.Future] = None
+        self._init_task: Optional[asyncio.Task] = None
         self.init_count: int = 0
         self._playwright: Optional[Playwright] = None
         self.logger = StructuredLogger("browser_controller")
         setup_structured_logging()
 
     async def initialize(self) -> None:
-        """Initialize the browser if not already initialized."""
-        if self.init_promise is not None:
-            try:
-                await self.init_promise
-            except Exception as e:
-                # If the current initialization fails, reset state to allow retry
-                self.init_promise = None
-                self.browser = None
-                self.logger.log_browser_event("initialization_failed", {
-                    "error": str(e),
-                    "attempt": self.init_count + 1
-                })
-                raise
-
-        if self.browser is not None:
-            return
+        """Initialize the browser if not already initialized.
 
-        # Create new initialization task
-        self.logger.log_progress(
-            step="browser_init",
-            status="starting",
-            progress=0.0,
-            message="Starting browser initialization"
-        )
-        self.init_promise = asyncio.create_task(self._do_browser_init())
-        try:
-            await self.init_promise
+        Concurrent callers share a single in-flight initialization; once it
+        has succeeded, later calls only await the already-completed future.
+        A cancelled caller leaves the shared initialization running.
+        """
+        ready = self._ready
+        if ready is None:
             self.logger.log_progress(
                 step="browser_init",
-                status="completed",
-                progress=1.0,
-                message="Browser initialization completed"
+                status="starting",
+                progress=0.0,
+                message="Starting browser initialization"
             )
+            ready = self._ready = asyncio.get_running_loop().create_future()
+            self._init_task = asyncio.ensure_future(self._do_browser_init(ready))
+        try:
+            await asyncio.shield(ready)
+        finally:
+            self.logger.flush()
+
+    async def _do_browser_init(self, ready: asyncio.Future) -> None:
+        """Run the launch once and publish its outcome on ``ready``."""
+        try:
+            await self._launch_browsers()
+        except asyncio.CancelledError:
+            if self._ready is ready:
+                self._ready = None
+            ready.cancel()
+            raise
         except Exception as e:
-            # Reset state on failure
-            self.init_promise = None
+            # Clear the future so the next caller retries
+            self._ready = None
             self.browser = None
+            self.logger.log_browser_event("initialization_failed", {
+                "error": str(e),
+                "attempt": self.init_count + 1
+            })
             self.logger.log_progress(
                 step="browser_init",
                 status="failed",
                 progress=0.0,
                 message=f"Browser initialization failed: {str(e)}"
             )
-            raise
-
-    async def _do_browser_init(self) -> None:
-        """Internal method to handle browser initialization."""
-        if self.browser is not None:
-            return
+            if not ready.done():
+                ready.set_exception(e)
+        else:
+            self.logger.log_progress(
+                step="browser_init",
+                status="completed",
+                progress=1.0,
+                message="Browser initialization completed"
+            )
+            if ready.cancelled():
+                # Cancelled from outside; the browsers are up, so publish a fresh future
+                ready = self._ready = asyncio.get_running_loop().create_future()
+            if not ready.done():
+                ready.set_result(None)
 
+    async def _launch_browsers(self) -> None:
+        """Start Playwright and launch the pooled browsers."""
         self.logger.log_progress(
             step="browser_init",
             status="launching",
@@ -79,15 +103,31 @@ class BrowserController:
                 progress=0.6,
                 message="Configuring browser"
             )
-            self.browser = await playwright.chromium.launch(
-                headless=True,
-                args=['--no-sandbox']
+            pool_size = _pool_size()
+            results = await asyncio.gather(
+                *(
+                    playwright.chromium.launch(headless=True, args=['--no-sandbox'])
+                    for _ in range(pool_size)
+                ),
+                return_exceptions=True
             )
+            browsers = [r for r in results if not isinstance(r, BaseException)]
+            errors = [r for r in results if isinstance(r, BaseException)]
+            if errors:
+                await asyncio.gather(*(b.close() for b in browsers), return_exceptions=True)
+                raise errors[0]
+
+            self._browsers = browsers
+            self._pool = asyncio.Queue()
+            for browser in browsers:
+                self._pool.put_nowait(browser)
+            self.browser = browsers[0]
             self.init_count += 1
             
             self.logger.log_browser_event("browser_launched", {
                 "initialization_count": self.init_count,
-                "headless": True
+                "headless": True,
+                "pool_size": pool_size
             })
             
         except Exception as e:
@@ -98,6 +138,29 @@ class BrowserController:
             })
             raise
 
+    async def acquire_context(self) -> Tuple[BrowserContext, Browser]:
+        """Check a warm browser out of the pool and open a fresh context on it.
+
+        Waits for a browser to be released if all are in use. Pass both
+        return values to release() when done.
+        """
+        await self.initialize()
+        browser = await self._pool.get()
+        try:
+            context = await browser.new_context()
+        except Exception:
+            self._pool.put_nowait(browser)
+            raise
+        return context, browser
+
+    async def release(self, browser: Browser, context: BrowserContext) -> None:
+        """Close a context from acquire_context() and return its browser to the pool."""
+        try:
+            await context.close()
+        finally:
+            if self._pool is not None and browser in self._browsers:
+                self._pool.put_nowait(browser)
+
     async def _cleanup_playwright(self) -> None:
         """Clean up the playwright context."""
         if self._playwright:
@@ -119,23 +182,36 @@ class BrowserController:
             message="Starting browser cleanup"
         )
         
-        if self.browser:
-            self.logger.log_progress(
-                step="cleanup",
-                status="closing_browser",
-                progress=0.5,
-                message="Closing browser"
-            )
-            await self.browser.close()
+        try:
+            if self._browsers:
+                self.logger.log_progress(
+                    step="cleanup",
+                    status="closing_browser",
+                    progress=0.5,
+                    message="Closing browser"
+                )
+                browsers, self._browsers = self._browsers, []
+                self._pool = None
+                # Close every pooled browser concurrently; one failure does not stop the rest
+                results = await asyncio.gather(
+                    *(b.close() for b in browsers), return_exceptions=True
+                )
+                for result in results:
+                    if isinstance(result, BaseException):
+                        self.logger.log_browser_event("browser_close_failed", {
+                            "error": str(result)
+                        })
+        finally:
             self.browser = None
-            
-        await self._cleanup_playwright()
-        self.init_promise = None
-        self.init_count = 0
+            await self._cleanup_playwright()
+            self._ready = None
+            self._init_task = None
+            self.init_count = 0
         
         self.logger.log_progress(
             step="cleanup",
             status="completed",
             progress=1.0,
             message="Browser cleanup completed"
-        ) 
\ No newline at end of file
+        )
+        self.logger.flush() 
\ No newline at end of file
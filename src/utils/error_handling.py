@@ -1,8 +1,17 @@
 import asyncio
+import logging
+import random
+import time
+from collections import defaultdict
 from datetime import datetime
 from typing import Dict, Any, Optional
 import re
 
+# Network/browser error codes such as ERR_CONNECTION_REFUSED
+_ERR_CODE_RE = re.compile(r'ERR_[A-Z_]+')
+
+logger = logging.getLogger("error_handler")
+
 class MaxRetriesExceededError(Exception):
     def __init__(self, operation: str, original_error: Exception):
         self.operation = operation
@@ -11,22 +20,37 @@ class MaxRetriesExceededError(Exception):
 
 class ErrorHandler:
     MAX_RETRIES = 3
+    # Upper bound on a single backoff delay, in seconds
+    MAX_BACKOFF = 30
 
-    def __init__(self):
-        self._retry_counts: Dict[str, int] = {}
+    def __init__(self, deadline_s: Optional[float] = None):
+        # Absolute monotonic time after which no further retries are scheduled
+        self._deadline = time.monotonic() + deadline_s if deadline_s is not None else None
+        self._retry_counts: Dict[str, int] = defaultdict(int)
         self._last_error: Optional[Dict[str, Any]] = None
 
-    async def handle_error(self, error: Exception, operation: str) -> None:
-        retry_count = self._retry_counts.get(operation, 0)
+    async def handle_error(self, error: Exception, operation: str, deadline: Optional[float] = None) -> None:
+        """Log a retryable error and back off before the caller retries.
+
+        ``deadline`` is a ``time.monotonic()`` value overriding the handler's
+        own deadline; a retry whose backoff would pass it is not scheduled.
+        """
+        retry_count = self._retry_counts[operation]
         
         if retry_count >= self.MAX_RETRIES:
             raise MaxRetriesExceededError(operation, error)
         
-        self._retry_counts[operation] = retry_count + 1
+        self._retry_counts[operation] += 1
         await self._log_error(error, operation, retry_count)
         
-        # Exponential backoff: 2^retry_count seconds
-        await asyncio.sleep(2 ** retry_count)
+        # Exponential backoff of 2^retry_count seconds, stretched by up to 50%
+        # so concurrent callers don't all retry at the same moment
+        delay = min(2 ** retry_count, self.MAX_BACKOFF) * (1 + random.random() / 2)
+        if deadline is None:
+            deadline = self._deadline
+        if deadline is not None and time.monotonic() + delay > deadline:
+            raise MaxRetriesExceededError(operation, error)
+        await asyncio.sleep(delay)
 
     async def _log_error(self, error: Exception, operation: str, retry_count: int) -> None:
         error_context = {
@@ -41,12 +65,14 @@ class ErrorHandler:
         }
         
         self._last_error = error_context
-        # In a real implementation, we would log to a file or logging service
-        print(f"Error: {error_context}")
+        logger.error("Error: %s", error_context)
 
     def extract_error_code(self, error: Exception) -> str:
         error_message = str(error)
-        match = re.search(r'ERR_[A-Z_]+', error_message)
+        # Substring test first: most errors carry no code at all
+        if 'ERR_' not in error_message:
+            return "UNKNOWN_ERROR"
+        match = _ERR_CODE_RE.search(error_message)
         return match.group(0) if match else "UNKNOWN_ERROR"
 
     def get_last_error(self) -> Optional[Dict[str, Any]]:
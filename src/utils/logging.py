@@ -1,11 +1,25 @@
+import atexit
 import json
 import logging
+import queue
+import re
+import time
+import weakref
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 import datetime
 from typing import Any, Dict, List, Optional
 from enum import Enum
 import traceback
 import types
 
+try:
+    import orjson
+except ImportError:  # optional C-accelerated encoder
+    orjson = None
+
+# Names defined on the LogRecord class itself, excluded from the extra fields
+_LOGRECORD_CLASS_ATTRS = frozenset(logging.LogRecord.__dict__)
+
 class LogLevel(str, Enum):
     CRITICAL = "CRITICAL"
     ERROR = "ERROR"
@@ -14,19 +28,23 @@ class LogLevel(str, Enum):
     DEBUG = "DEBUG"
     TRACE = "TRACE"
 
+def _json_default(obj):
+    """Serialize the non-JSON objects that show up in log records."""
+    if isinstance(obj, Exception):
+        return {
+            'type': obj.__class__.__name__,
+            'message': str(obj),
+            'traceback': traceback.format_exception(type(obj), obj, obj.__traceback__)
+        }
+    if isinstance(obj, type):
+        return obj.__name__
+    if isinstance(obj, types.TracebackType):
+        return traceback.format_tb(obj)
+    raise TypeError(f'Object of type {obj.__class__.__name__} is not JSON serializable')
+
 class LogJSONEncoder(json.JSONEncoder):
     def default(self, obj):
-        if isinstance(obj, Exception):
-            return {
-                'type': obj.__class__.__name__,
-                'message': str(obj),
-                'traceback': traceback.format_exception(type(obj), obj, obj.__traceback__)
-            }
-        if isinstance(obj, type):
-            return obj.__name__
-        if isinstance(obj, types.TracebackType):
-            return traceback.format_tb(obj)
-        return super().default(obj)
+        return _json_default(obj)
 
 class LogFormatter(logging.Formatter):
     def __init__(self, use_json: bool = True):
@@ -47,10 +65,10 @@ class LogFormatter(logging.Formatter):
         timestamp = datetime.datetime.fromtimestamp(record.created).strftime("%Y-%m-%dT%H:%M:%S")
         
         # Extract additional fields if they exist
-        extra_fields = {}
-        for key, value in vars(record).items():
-            if key not in logging.LogRecord.__dict__ and not key.startswith('_'):
-                extra_fields[key] = value
+        extra_fields = {
+            key: value for key, value in vars(record).items()
+            if key not in _LOGRECORD_CLASS_ATTRS and not key.startswith('_')
+        }
 
         if self.use_json:
             log_entry = {
@@ -70,6 +88,8 @@ class LogFormatter(logging.Formatter):
             if record.exc_info and record.levelno >= logging.ERROR:
                 log_entry["error"] = self._serialize_error(record.exc_info)
             
+            if orjson is not None:
+                return orjson.dumps(log_entry, default=_json_default, option=orjson.OPT_NON_STR_KEYS).decode()
             return json.dumps(log_entry, cls=LogJSONEncoder)
         else:
             # Compact format for non-JSON logs
@@ -80,30 +100,76 @@ class LogFormatter(logging.Formatter):
             
             return basic_msg
 
+def _emit_batches(
+    logger: logging.Logger, batched_events: Dict[str, List[Dict[str, Any]]], data_key: str
+) -> None:
+    """Log one record per non-empty batch and empty the batches."""
+    for event_type, events in batched_events.items():
+        if events:
+            logger.info(
+                "Batch: %d %s events", len(events), event_type,
+                extra={
+                    "event_type": f"batched_{event_type}",
+                    data_key: {
+                        "count": len(events),
+                        "events": events
+                    }
+                }
+            )
+    batched_events.clear()
+
 class BatchedEventLogger:
-    def __init__(self, logger: logging.Logger):
+    def __init__(
+        self,
+        logger: logging.Logger,
+        max_batch_size: int = 100,
+        max_batch_age: Optional[float] = 5.0,
+        data_key: str = "event_data"
+    ):
         self._logger = logger
         self._batched_events: Dict[str, List[Dict[str, Any]]] = {}
+        # A batch is emitted once it holds max_batch_size events, or when an
+        # event is added max_batch_age seconds after the oldest queued one
+        self._max_batch_size = max_batch_size
+        self._max_batch_age = max_batch_age
+        self._data_key = data_key
+        self._oldest: Optional[float] = None
+        # Emit anything still queued when the batcher is collected or at exit
+        weakref.finalize(self, _emit_batches, logger, self._batched_events, data_key)
         
     def add_event(self, event_type: str, event_data: Dict[str, Any]) -> None:
         if event_type not in self._batched_events:
             self._batched_events[event_type] = []
-        self._batched_events[event_type].append(event_data)
+        events = self._batched_events[event_type]
+        events.append(event_data)
+        
+        now = time.monotonic()
+        if self._oldest is None:
+            self._oldest = now
+        if len(events) >= self._max_batch_size or (
+            self._max_batch_age is not None and now - self._oldest >= self._max_batch_age
+        ):
+            self.flush()
         
     def flush(self) -> None:
-        for event_type, events in self._batched_events.items():
-            if events:
-                self._logger.info(
-                    f"Batch: {len(events)} {event_type} events",
-                    extra={
-                        "event_type": f"batched_{event_type}",
-                        "event_data": {
-                            "count": len(events),
-                            "events": events
-                        }
-                    }
-                )
-        self._batched_events.clear()
+        _emit_batches(self._logger, self._batched_events, self._data_key)
+        self._oldest = None
+
+# Rotate the log file at 10 MiB, keeping five backups
+LOG_FILE_MAX_BYTES = 10 * 2**20
+LOG_FILE_BACKUP_COUNT = 5
+
+# Background listener writing queued records to the log file
+_file_listener: Optional[QueueListener] = None
+
+def _stop_file_listener() -> None:
+    """Flush and stop the log file listener, if one is running."""
+    global _file_listener
+    if _file_listener is not None:
+        _file_listener.stop()
+        _file_listener = None
+
+atexit.register(_stop_file_listener)
 
 def setup_logging(
     level: str = "INFO",
@@ -119,21 +185,29 @@ def setup_logging(
         use_json: Whether to use JSON formatting
         log_file: Optional file to write logs to
         exclude_patterns: Optional list of patterns to exclude from logging
+    
+    File records are formatted on the calling thread and written by a
+    background listener to a rotating log file.
     """
+    global _file_listener
     root_logger = logging.getLogger()
     root_logger.setLevel(level)
     
     # Clear any existing handlers
     root_logger.handlers.clear()
+    _stop_file_listener()
     
     # Create console handler
     console_handler = logging.StreamHandler()
     console_handler.setFormatter(LogFormatter(use_json=use_json))
     
     if exclude_patterns:
+        # One regex search per record instead of a scan per pattern
+        exclude_re = re.compile('|'.join(re.escape(pattern) for pattern in exclude_patterns))
+        
         class ExcludeFilter(logging.Filter):
             def filter(self, record: logging.LogRecord) -> bool:
-                return not any(pattern in record.getMessage() for pattern in exclude_patterns)
+                return exclude_re.search(record.getMessage()) is None
         
         console_handler.addFilter(ExcludeFilter())
     
@@ -141,10 +215,18 @@ def setup_logging(
     
     # Add file handler if specified
     if log_file:
-        file_handler = logging.FileHandler(log_file)
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        file_handler = QueueHandler(log_queue)
         file_handler.setFormatter(LogFormatter(use_json=True))  # Always use JSON for file logging
         if exclude_patterns:
             file_handler.addFilter(ExcludeFilter())
+        
+        # The listener writes the already formatted records
+        rotating_handler = RotatingFileHandler(
+            log_file, maxBytes=LOG_FILE_MAX_BYTES, backupCount=LOG_FILE_BACKUP_COUNT
+        )
+        _file_listener = QueueListener(log_queue, rotating_handler, respect_handler_level=True)
+        _file_listener.start()
         root_logger.addHandler(file_handler)
 
 # Production filter patterns
@@ -1,15 +1,32 @@
 from typing import Optional, Dict, Any, List
+import atexit
 import logging
 import json
-from dataclasses import dataclass, asdict
-from datetime import datetime
+import queue
+import re
+import time
+from collections import deque
+from logging.handlers import QueueHandler, QueueListener
+from dataclasses import dataclass
+from datetime import datetime, timedelta
 from colorama import init, Fore, Style
 import os
+from .logging import BatchedEventLogger
+
+try:
+    import orjson
+except ImportError:  # optional C-accelerated encoder
+    orjson = None
 
 # Initialize colorama
 init()
 
-@dataclass
+_EPOCH = datetime(1970, 1, 1)
+
+# Message keywords highlighted by ColorizedFormatter
+_KEYWORD_RE = re.compile(r'✓|×|STEP')
+
+@dataclass(frozen=True)
 class ColorScheme:
     """Color scheme for different log elements."""
     ERROR: str = Fore.RED
@@ -21,52 +38,62 @@ class ColorScheme:
     STEP: str = Fore.BLUE
     RESET: str = Style.RESET_ALL
 
+# Shared by every ColorizedFormatter; other level names fall back to INFO
+_COLORS = ColorScheme()
+_RESET = _COLORS.RESET
+_LEVEL_COLORS = {
+    "ERROR": _COLORS.ERROR,
+    "WARNING": _COLORS.WARNING,
+    "INFO": _COLORS.INFO,
+    "DEBUG": _COLORS.DEBUG,
+}
+
+def _colorize(text: str, color: str) -> str:
+    """Wrap text in a color code and a reset."""
+    return f"{color}{text}{_RESET}"
+
+# Colored forms of the standard level names and highlighted keywords
+_LEVEL_COLORED = {level: _colorize(level, color) for level, color in _LEVEL_COLORS.items()}
+_KEYWORD_COLORED = {
+    "✓": _colorize("✓", _COLORS.SUCCESS),
+    "×": _colorize("×", _COLORS.ERROR),
+    "STEP": _colorize("STEP", _COLORS.STEP),
+}
+
 class ColorizedFormatter(logging.Formatter):
     """Formatter that adds colors to log output."""
     
     def __init__(self, use_colors: bool = True):
         super().__init__()
         self.use_colors = use_colors and not os.getenv('NO_COLOR')
-        self.colors = ColorScheme()
-    
-    def colorize(self, text: str, color: str) -> str:
-        """Add color to text if colors are enabled."""
-        if self.use_colors:
-            return f"{color}{text}{self.colors.RESET}"
-        return text
+        self.colors = _COLORS
+        # Reused for every record's structured data
+        self._data_encoder = json.JSONEncoder(indent=2)
     
     def format(self, record: logging.LogRecord) -> str:
         """Format the log record with colors."""
-        # Get the appropriate color for the log level
-        level_color = getattr(self.colors, record.levelname, self.colors.INFO)
-        
-        # Format timestamp
-        timestamp = self.colorize(
-            datetime.utcnow().strftime("%H:%M:%S"),
-            self.colors.TIMESTAMP
-        )
-        
-        # Format level
-        level = self.colorize(record.levelname, level_color)
-        
-        # Format message and handle special keywords
+        timestamp = time.strftime("%H:%M:%S", time.gmtime(record.created))
+        level = record.levelname
         msg = record.getMessage()
-        if "✓" in msg:
-            msg = msg.replace("✓", self.colorize("✓", self.colors.SUCCESS))
-        if "×" in msg:
-            msg = msg.replace("×", self.colorize("×", self.colors.ERROR))
-        if "STEP" in msg:
-            msg = msg.replace("STEP", self.colorize("STEP", self.colors.STEP))
+        
+        if self.use_colors:
+            timestamp = _colorize(timestamp, _COLORS.TIMESTAMP)
+            level = _LEVEL_COLORED.get(level) or _colorize(level, _COLORS.INFO)
+            # One substitution pass for all special keywords
+            if "✓" in msg or "×" in msg or "STEP" in msg:
+                msg = _KEYWORD_RE.sub(lambda m: _KEYWORD_COLORED[m.group(0)], msg)
         
         # Build the basic log message
         log_message = f"[{timestamp}] {level} {msg}"
         
         # Add structured data if available
         if hasattr(record, 'event_type'):
-            event_type = self.colorize(record.event_type, self.colors.INFO)
+            event_type = record.event_type
+            if self.use_colors:
+                event_type = _colorize(event_type, _COLORS.INFO)
             if hasattr(record, 'data'):
                 # Format the data as JSON but don't colorize it
-                data_str = json.dumps(record.data, indent=2)
+                data_str = self._data_encoder.encode(record.data)
                 log_message = f"{log_message} | {event_type} | {data_str}"
         
         return log_message
@@ -74,10 +101,15 @@ class ColorizedFormatter(logging.Formatter):
 class JSONFormatter(logging.Formatter):
     """Custom JSON formatter for structured logs."""
     
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # One compact encoder for all records when orjson is unavailable
+        self._encoder = json.JSONEncoder(separators=(',', ':'))
+    
     def format(self, record: logging.LogRecord) -> str:
         """Format the log record as a JSON string."""
         output = {
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": (_EPOCH + timedelta(seconds=record.created)).isoformat(timespec='milliseconds'),
             "level": record.levelname,
             "message": record.getMessage(),
             "logger": record.name
@@ -89,27 +121,52 @@ class JSONFormatter(logging.Formatter):
                 if key not in output and key not in ('args', 'exc_info', 'exc_text', 'msg'):
                     output[key] = value
             
-        return json.dumps(output)
+        if orjson is not None:
+            return orjson.dumps(output, option=orjson.OPT_NON_STR_KEYS).decode()
+        return self._encoder.encode(output)
+
+# Background listener writing queued records to the console
+_queue_listener: Optional[QueueListener] = None
+
+def _stop_queue_listener() -> None:
+    """Flush and stop the console listener, if one is running."""
+    global _queue_listener
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        _queue_listener = None
+
+atexit.register(_stop_queue_listener)
 
 def setup_structured_logging(level: int = logging.INFO, use_colors: bool = True, json_output: bool = False) -> None:
-    """Set up structured logging with optional colorized output."""
+    """Set up structured logging with optional colorized output.
+    
+    Records are formatted by the root handler and handed to a queue; a
+    background listener thread does the console writes, so logging from
+    coroutines never blocks the event loop on stream I/O.
+    """
+    global _queue_listener
     root_logger = logging.getLogger()
     root_logger.setLevel(level)
     
-    # Remove existing handlers
-    for handler in root_logger.handlers[:]:
-        root_logger.removeHandler(handler)
+    # Drop existing handlers in one step and close the ones removed
+    old_handlers, root_logger.handlers = root_logger.handlers, []
+    for old_handler in old_handlers:
+        old_handler.close()
+    _stop_queue_listener()
     
-    # Create console handler with appropriate formatter
-    handler = logging.StreamHandler()
+    # Queue handler with the appropriate formatter; the listener only writes
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    handler = QueueHandler(log_queue)
     if json_output:
         handler.setFormatter(JSONFormatter())
     else:
         handler.setFormatter(ColorizedFormatter(use_colors=use_colors))
     
+    _queue_listener = QueueListener(log_queue, logging.StreamHandler(), respect_handler_level=True)
+    _queue_listener.start()
     root_logger.addHandler(handler)
 
-@dataclass
+@dataclass(slots=True)
 class ProgressEvent:
     """Represents a progress update in the browser automation process."""
     step: str
@@ -122,7 +179,17 @@ class ProgressEvent:
         if self.timestamp is None:
             self.timestamp = datetime.utcnow().isoformat()
 
-@dataclass
+    def to_dict(self) -> Dict[str, Any]:
+        """Shallow dict of the event; cheaper than dataclasses.asdict."""
+        return {
+            "step": self.step,
+            "status": self.status,
+            "progress": self.progress,
+            "message": self.message,
+            "timestamp": self.timestamp
+        }
+
+@dataclass(slots=True)
 class BrowserEvent:
     """Represents a browser-related event."""
     event_type: str
@@ -133,34 +200,73 @@ class BrowserEvent:
         if self.timestamp is None:
             self.timestamp = datetime.utcnow().isoformat()
 
+    def to_dict(self) -> Dict[str, Any]:
+        """Shallow dict of the event; ``details`` is not copied."""
+        return {
+            "event_type": self.event_type,
+            "details": self.details,
+            "timestamp": self.timestamp
+        }
+
+def _history_maxlen() -> int:
+    """Events kept per history, from STRUCTURED_LOG_HISTORY_MAXLEN (default 1000)."""
+    try:
+        return max(1, int(os.getenv("STRUCTURED_LOG_HISTORY_MAXLEN", "1000")))
+    except ValueError:
+        return 1000
+
 class StructuredLogger:
     """Handles structured logging with progress reporting and feedback."""
     
-    def __init__(self, logger_name: str = "browser_automation"):
+    def __init__(self, logger_name: str = "browser_automation", history_maxlen: Optional[int] = None):
         self.logger = logging.getLogger(logger_name)
-        self.progress_events: List[ProgressEvent] = []
-        self.browser_events: List[BrowserEvent] = []
+        # Bounded so long-running processes keep only the most recent events
+        maxlen = history_maxlen if history_maxlen is not None else _history_maxlen()
+        self.progress_events: deque[ProgressEvent] = deque(maxlen=maxlen)
+        self.browser_events: deque[BrowserEvent] = deque(maxlen=maxlen)
+        self._progress_events_dropped = 0
+        self._browser_events_dropped = 0
         self._current_progress: float = 0.0
+        # Progress updates are emitted in batches, carrying the usual "data" key
+        self._batcher = BatchedEventLogger(self.logger, data_key="data")
         
     def log_progress(self, step: str, status: str, progress: float, message: str) -> None:
         """Log a progress update."""
         event = ProgressEvent(step=step, status=status, progress=progress, message=message)
+        if len(self.progress_events) == self.progress_events.maxlen:
+            self._progress_events_dropped += 1
         self.progress_events.append(event)
         self._current_progress = progress
         
-        self.logger.info("Progress Update", extra={
-            "event_type": "progress",
-            "data": asdict(event)
-        })
+        # History is kept regardless; skip building records nobody will emit
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+        if status == "failed":
+            # Failures go out immediately, after anything already queued
+            self._batcher.flush()
+            self.logger.info("Progress Update", extra={
+                "event_type": "progress",
+                "data": event.to_dict()
+            })
+        else:
+            self._batcher.add_event("progress", event.to_dict())
+    
+    def flush(self) -> None:
+        """Emit any batched progress updates."""
+        self._batcher.flush()
     
     def log_browser_event(self, event_type: str, details: Dict[str, Any]) -> None:
         """Log a browser-related event."""
         event = BrowserEvent(event_type=event_type, details=details)
+        if len(self.browser_events) == self.browser_events.maxlen:
+            self._browser_events_dropped += 1
         self.browser_events.append(event)
         
-        self.logger.info(f"Browser Event: {event_type}", extra={
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+        self.logger.info("Browser Event: %s", event_type, extra={
             "event_type": "browser",
-            "data": asdict(event)
+            "data": event.to_dict()
         })
     
     def get_current_progress(self) -> float:
@@ -169,16 +275,25 @@ class StructuredLogger:
     
     def get_progress_history(self) -> List[Dict[str, Any]]:
         """Get the history of progress events."""
-        return [asdict(event) for event in self.progress_events]
+        return [event.to_dict() for event in self.progress_events]
     
     def get_browser_events(self) -> List[Dict[str, Any]]:
         """Get all browser events."""
-        return [asdict(event) for event in self.browser_events]
+        return [event.to_dict() for event in self.browser_events]
+    
+    def get_dropped_counts(self) -> Dict[str, int]:
+        """Get how many events were evicted from each bounded history."""
+        return {
+            "progress": self._progress_events_dropped,
+            "browser": self._browser_events_dropped
+        }
     
     def clear_history(self) -> None:
         """Clear all stored events."""
         self.progress_events.clear()
         self.browser_events.clear()
+        self._progress_events_dropped = 0
+        self._browser_events_dropped = 0
         self._current_progress = 0.0
 
 class EventBatcher:
@@ -202,22 +317,27 @@ class EventBatcher:
                 "duration_ms": 0
             }
 
+        # Tally statuses and durations in one pass over the batch
+        success_count = error_count = total_duration = 0
+        for event in self.events:
+            status = event.get_status()
+            if status == "success":
+                success_count += 1
+            elif status == "failed":
+                error_count += 1
+            metrics = event.metrics
+            if metrics and "duration_ms" in metrics:
+                total_duration += metrics["duration_ms"]
+
         summary = {
             "timestamp": datetime.now().isoformat(),
             "total_events": len(self.events),
-            "success_count": sum(1 for e in self.events if e.get_status() == "success"),
-            "error_count": sum(1 for e in self.events if e.get_status() == "failed"),
-            "duration_ms": self._calculate_total_duration()
+            "success_count": success_count,
+            "error_count": error_count,
+            "duration_ms": total_duration
         }
         self.events = []
         return summary
 
     def get_event_count(self) -> int:
-        return len(self.events)
-
-    def _calculate_total_duration(self) -> int:
-        total_duration = 0
-        for event in self.events:
-            if event.metrics and "duration_ms" in event.metrics:
-                total_duration += event.metrics["duration_ms"]
-        return total_duration 
\ No newline at end of file
+        return len(self.events) 
\ No newline at end of file
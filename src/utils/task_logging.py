@@ -1,20 +1,144 @@
 from typing import Dict, Any, List, Literal, Optional, Union, Callable, TypeVar, Awaitable
 from dataclasses import dataclass, asdict, field
-from datetime import datetime
+from datetime import datetime, timezone
 import json
 from enum import Enum
 import traceback
+from types import TracebackType
+from functools import lru_cache
 import asyncio
 import random
 import os
+import sys
+import time
+import logging
+import queue
+import threading
+import atexit
 from colorama import init, Fore, Style
 
+try:
+    import orjson
+except ImportError:  # optional C-accelerated encoder
+    orjson = None
+
 # Initialize colorama for cross-platform color support
 init()
 
 # Define generic type parameter at module level
 T = TypeVar('T')
 
+# State dumps are written only while this logger is enabled for INFO; its
+# level is left unset, so that follows the effective (usually root) level.
+logger = logging.getLogger(__name__)
+
+# Last formatted second, as (epoch seconds, ISO string)
+_ISO_CACHE = (0, "")
+
+def _utcnow_iso() -> str:
+    """Current UTC time as a naive ISO string; the date/time part is rebuilt once per second."""
+    global _ISO_CACHE
+    seconds, micros = divmod(time.time_ns() // 1000, 1_000_000)
+    cached_at, prefix = _ISO_CACHE
+    if seconds != cached_at:
+        prefix = datetime.fromtimestamp(seconds, timezone.utc).replace(tzinfo=None).isoformat()
+        _ISO_CACHE = (seconds, prefix)
+    # Same shape as datetime.isoformat(), which omits a zero fraction
+    return f"{prefix}.{micros:06d}" if micros else prefix
+
+def _encode_state(state: Dict[str, Any]) -> bytes:
+    """Encode a state dump as indented JSON followed by a newline."""
+    if orjson is not None:
+        return orjson.dumps(
+            state, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE
+        )
+    return (json.dumps(state, indent=2) + "\n").encode("utf-8")
+
+def _write_stdout(data: bytes) -> None:
+    """Write encoded output, after any pending text on stdout."""
+    stdout = sys.stdout
+    stdout.flush()
+    if hasattr(stdout, 'buffer'):
+        stdout.buffer.write(data)
+        stdout.buffer.flush()
+    else:
+        stdout.write(data.decode("utf-8"))
+
+# State dumps are encoded by the caller and written by a background thread,
+# so callers on the event loop never block on stdout. Each queued item is
+# (encoded dump or None, event to set once written or None).
+_state_queue: queue.SimpleQueue = queue.SimpleQueue()
+_state_writer: Optional[threading.Thread] = None
+_state_writer_lock = threading.Lock()
+
+def _drain_state_queue() -> None:
+    """Write queued state dumps as soon as they arrive, in submission order."""
+    while True:
+        items = [_state_queue.get()]
+        # Coalesce whatever else is already queued into the same write
+        while True:
+            try:
+                items.append(_state_queue.get_nowait())
+            except queue.Empty:
+                break
+        chunks: List[bytes] = []
+        waiters: List[threading.Event] = []
+        stop = False
+        for item in items:
+            if item is None:
+                stop = True
+                continue
+            data, done = item
+            if data is not None:
+                chunks.append(data)
+            if done is not None:
+                waiters.append(done)
+        try:
+            if chunks:
+                _write_stdout(b"".join(chunks))
+        except Exception:
+            logger.exception("Failed to write task state")
+        finally:
+            for done in waiters:
+                done.set()
+        if stop:
+            return
+
+def _submit_state(item: tuple) -> None:
+    """Queue an item for the state writer, starting it on first use."""
+    global _state_writer
+    if _state_writer is None:
+        with _state_writer_lock:
+            if _state_writer is None:
+                _state_writer = threading.Thread(
+                    target=_drain_state_queue, name="task-state-writer", daemon=True
+                )
+                _state_writer.start()
+    _state_queue.put(item)
+
+def _flush_state_writer() -> None:
+    """Wait until every state dump queued so far has been written."""
+    if _state_writer is None:
+        return  # Nothing has been queued
+    done = threading.Event()
+    _submit_state((None, done))
+    done.wait()
+
+def _stop_state_writer() -> None:
+    """Drain the state queue and stop the writer thread."""
+    global _state_writer
+    if _state_writer is not None:
+        _state_queue.put(None)
+        _state_writer.join()
+        _state_writer = None
+
+atexit.register(_stop_state_writer)
+
+@lru_cache(maxsize=256)
+def _backoff_delay(base_delay: float, max_delay: float, attempt: int) -> float:
+    """Capped exponential delay before the given retry, without jitter."""
+    return min(base_delay * (1 << (attempt - 1)), max_delay)
+
 class TaskStatus(str, Enum):
     PENDING = "pending"
     RUNNING = "running"
@@ -31,15 +155,17 @@ class ActionType(str, Enum):
     @property
     def emoji(self) -> str:
         """Get the emoji representation of the action type."""
-        return {
-            ActionType.NAVIGATION: "🌐",
-            ActionType.INTERACTION: "🖱️",
-            ActionType.EXTRACTION: "📑",
-            ActionType.VALIDATION: "✅",
-            ActionType.RECOVERY: "🔄"
-        }[self]
-
-@dataclass
+        return _ACTION_EMOJI[self]
+
+_ACTION_EMOJI = {
+    ActionType.NAVIGATION: "🌐",
+    ActionType.INTERACTION: "🖱️",
+    ActionType.EXTRACTION: "📑",
+    ActionType.VALIDATION: "✅",
+    ActionType.RECOVERY: "🔄"
+}
+
+@dataclass(slots=True)
 class PerformanceMetrics:
     """Performance metrics for task execution."""
     total_duration: float = 0.0
@@ -59,7 +185,7 @@ class PerformanceMetrics:
             "step_breakdown": self.step_breakdown
         }
 
-@dataclass
+@dataclass(slots=True)
 class ErrorInfo:
     """Information about an error that occurred."""
     type: str
@@ -67,8 +193,22 @@ class ErrorInfo:
     step: int
     action: str
     traceback: Optional[str] = None
+    # Kept so the traceback is only formatted if it is actually logged; the
+    # traceback is captured separately since it grows as the error propagates
+    exception: Optional[BaseException] = field(default=None, repr=False, compare=False)
+    exc_traceback: Optional[TracebackType] = field(default=None, repr=False, compare=False)
+    
+    @property
+    def traceback_str(self) -> Optional[str]:
+        """The given traceback, or the stored exception's formatted as traceback.format_exc() gives."""
+        if self.traceback is None and self.exception is not None:
+            exception = self.exception
+            self.traceback = "".join(
+                traceback.format_exception(type(exception), exception, self.exc_traceback)
+            )
+        return self.traceback
 
-@dataclass
+@dataclass(slots=True)
 class StepInfo:
     """Information about the current step in a task."""
     number: int
@@ -93,7 +233,7 @@ class StepInfo:
         """Get the string value of the status."""
         return self.status.value if isinstance(self.status, TaskStatus) else str(self.status)
 
-@dataclass
+@dataclass(slots=True)
 class BrowserState:
     """Current state of the browser."""
     url: str
@@ -104,13 +244,14 @@ class BrowserState:
     active_element: Optional[str] = None
     page_title: Optional[str] = None
 
-@dataclass
+@dataclass(slots=True)
 class RetryConfig:
     """Configuration for retry behavior."""
     max_retries: int = 3
     base_delay: float = 1.0
     max_delay: float = 10.0
     jitter: float = 0.1
+    timeout: Optional[float] = None  # Per-attempt limit in seconds; None waits indefinitely
     
     def get_delay(self, attempt: int) -> float:
         """Calculate delay for a given attempt using exponential backoff."""
@@ -119,9 +260,7 @@ class RetryConfig:
         if attempt > self.max_retries:
             return -1
             
-        # Calculate exponential delay
-        delay = self.base_delay * (2 ** (attempt - 1))
-        delay = min(delay, self.max_delay)
+        delay = _backoff_delay(self.base_delay, self.max_delay, attempt)
         
         # Add jitter if configured
         if self.jitter > 0:
@@ -130,14 +269,14 @@ class RetryConfig:
             
         return max(0, delay)
 
-@dataclass
+@dataclass(slots=True)
 class RetryInfo:
     """Information about retry attempts."""
     attempts: int = 0
     success: bool = False
     history: List[Dict[str, Any]] = field(default_factory=list)
 
-@dataclass
+@dataclass(slots=True)
 class TaskContext:
     """Context information for a task."""
     id: str
@@ -152,7 +291,7 @@ class TaskContext:
     
     def __post_init__(self):
         if self.started_at is None:
-            self.started_at = datetime.utcnow().isoformat()
+            self.started_at = _utcnow_iso()
         if self.performance is None:
             self.performance = PerformanceMetrics()
         if self.retries is None:
@@ -160,60 +299,56 @@ class TaskContext:
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert the context to a dictionary for logging."""
-        result = {
-            "timestamp": datetime.utcnow().isoformat(),
-            "task": {
-                "id": self.id,
-                "goal": self.goal,
-                "progress": self._format_progress(),
-                "elapsed_time": self._calculate_elapsed_time(),
-                "status": self.current_step.status_value
-            }
-        }
+        step = self.current_step
+        browser = self.browser_state
+        retries = self.retries
+        error = self.error
+        performance = self.performance
         
-        # Add retry information if available
-        if self.retries and self.retries.attempts > 0:
-            result["task"]["retries"] = {
-                "attempts": self.retries.attempts,
-                "success": self.retries.success,
-                "history": self.retries.history
-            }
+        task = {
+            "id": self.id,
+            "goal": self.goal,
+            "progress": self._format_progress(),
+            "elapsed_time": self._calculate_elapsed_time(),
+            "status": step.status_value,
+            # Retry information and current action details, when present
+            **({"retries": {
+                "attempts": retries.attempts,
+                "success": retries.success,
+                "history": retries.history
+            }} if retries and retries.attempts > 0 else {}),
+            **({"current_action": step.action_type.value} if step.action_type else {}),
+            **({"action_context": step.context} if step.context else {}),
+            **({"action_results": step.results} if step.results else {})
+        }
         
-        # Add current action information
-        if self.current_step.action_type:
-            result["task"]["current_action"] = self.current_step.action_type.value
-        if self.current_step.context:
-            result["task"]["action_context"] = self.current_step.context
-        if self.current_step.results:
-            result["task"]["action_results"] = self.current_step.results
-            
-        # Add browser state
-        result["browser"] = {
-            "url": self.browser_state.url,
-            "state": "ready" if self.browser_state.page_ready else "loading",
-            "visible_elements": self.browser_state.visible_elements,
-            "dynamic_content": "loaded" if self.browser_state.dynamic_content_loaded else "loading"
+        browser_info = {
+            "url": browser.url,
+            "state": "ready" if browser.page_ready else "loading",
+            "visible_elements": browser.visible_elements,
+            "dynamic_content": "loaded" if browser.dynamic_content_loaded else "loading",
+            **({"current_frame": browser.current_frame} if browser.current_frame else {}),
+            **({"active_element": browser.active_element} if browser.active_element else {}),
+            **({"page_title": browser.page_title} if browser.page_title else {})
         }
         
-        if self.browser_state.current_frame:
-            result["browser"]["current_frame"] = self.browser_state.current_frame
-        if self.browser_state.active_element:
-            result["browser"]["active_element"] = self.browser_state.active_element
-        if self.browser_state.page_title:
-            result["browser"]["page_title"] = self.browser_state.page_title
-            
-        if self.error:
+        result = {
+            "timestamp": _utcnow_iso(),
+            "task": task,
+            "browser": browser_info
+        }
+        if error:
             result["error"] = {
-                "type": self.error.type,
-                "message": self.error.message,
-                "step": self.error.step,
-                "action": self.error.action
+                "type": error.type,
+                "message": error.message,
+                "step": error.step,
+                "action": error.action
             }
-            if self.error.traceback:
-                result["error"]["traceback"] = self.error.traceback
-                
-        if self.performance and self.performance.step_breakdown:
-            result["performance"] = self.performance.to_dict()
+            traceback_str = error.traceback_str
+            if traceback_str:
+                result["error"]["traceback"] = traceback_str
+        if performance and performance.step_breakdown:
+            result["performance"] = performance.to_dict()
             
         return result
     
@@ -231,7 +366,7 @@ class TaskContext:
         elapsed = datetime.utcnow() - start
         return f"{elapsed.total_seconds():.1f}s"
 
-@dataclass
+@dataclass(slots=True)
 class ColorScheme:
     """Color scheme for log messages."""
     error: str = Fore.RED
@@ -256,25 +391,24 @@ class LogFormatter:
     
     def __init__(self, color_scheme: Optional[ColorScheme] = None):
         self.colors = color_scheme or ColorScheme()
-    
-    def format(self, record: Any) -> str:
-        """Format a log record with appropriate colors."""
-        level_colors = {
+        self._level_colors = {
             "ERROR": self.colors.error,
             "WARNING": self.colors.warning,
             "INFO": self.colors.info
         }
-        
+    
+    def format(self, record: Any) -> str:
+        """Format a log record with appropriate colors."""
         # Format timestamp
         timestamp = datetime.fromtimestamp(record.created).strftime("%Y-%m-%d %H:%M:%S")
         
         # Color the level name
-        level_color = level_colors.get(record.levelname, self.colors.info)
+        level_color = self._level_colors.get(record.levelname, self.colors.info)
         colored_level = self.colors.apply(record.levelname, level_color)
         
         return f"[{timestamp}] {colored_level}: {record.msg}"
 
-@dataclass
+@dataclass(slots=True)
 class SeparatorStyle:
     """Style configuration for visual separators."""
     task: str = "=" * 50  # Task separator (longer)
@@ -298,7 +432,7 @@ class TaskLogger:
             current_step=StepInfo(
                 number=1,
                 description="Task initialized",
-                started_at=datetime.utcnow().isoformat(),
+                started_at=_utcnow_iso(),
                 status=TaskStatus.PENDING
             ),
             browser_state=BrowserState(
@@ -309,9 +443,23 @@ class TaskLogger:
             ),
             retries=RetryInfo()
         )
-        self._step_start_time: Optional[datetime] = None
+        # time.monotonic() when the current step started
+        self._step_start_time: Optional[float] = None
         self.colors = color_scheme or ColorScheme()
         self.separators = separator_style or SeparatorStyle()
+        
+        # Colored status symbols and action emojis, built once per logger
+        self._default_status_symbol = self.colors.apply("→", self.colors.info)
+        self._status_symbols = {
+            TaskStatus.COMPLETE: self.colors.apply("✓", self.colors.success),
+            TaskStatus.FAILED: self.colors.apply("×", self.colors.error),
+            TaskStatus.RUNNING: self._default_status_symbol,
+            TaskStatus.PENDING: self._default_status_symbol
+        }
+        self._colored_emojis = {
+            action_type: self.colors.apply(emoji, self.colors.info)
+            for action_type, emoji in _ACTION_EMOJI.items()
+        }
         self.use_separators = use_separators
         
         # Add initial task separator and goal
@@ -342,7 +490,7 @@ class TaskLogger:
         step = StepInfo(
             number=self.context.current_step.number,
             description=entry,
-            started_at=datetime.utcnow().isoformat(),
+            started_at=_utcnow_iso(),
             status=TaskStatus.RUNNING
         )
         self.context.log_history.append(step)
@@ -357,13 +505,13 @@ class TaskLogger:
                    suppress_similar: bool = False) -> None:
         """Update the current step information."""
         step_duration = None
-        if self._step_start_time:
-            step_duration = (datetime.utcnow() - self._step_start_time).total_seconds()
+        if self._step_start_time is not None:
+            step_duration = time.monotonic() - self._step_start_time
             
         new_step = StepInfo(
             number=self.context.current_step.number + 1,
             description=description,
-            started_at=datetime.utcnow().isoformat(),
+            started_at=_utcnow_iso(),
             status=status,
             duration=step_duration,
             progress=progress,
@@ -377,7 +525,7 @@ class TaskLogger:
         if not suppress_similar or not self._is_similar_to_previous(new_step):
             self.context.log_history.append(new_step)
             self.context.current_step = new_step
-            self._step_start_time = datetime.utcnow()
+            self._step_start_time = time.monotonic()
         else:
             # Update the previous step with new status/results
             prev_step = self.context.log_history[-1]
@@ -408,19 +556,12 @@ class TaskLogger:
         
         # Color-coded status symbols
         if isinstance(step.status, TaskStatus):
-            status_symbol = {
-                TaskStatus.COMPLETE: self.colors.apply("✓", self.colors.success),
-                TaskStatus.FAILED: self.colors.apply("×", self.colors.error),
-                TaskStatus.RUNNING: self.colors.apply("→", self.colors.info),
-                TaskStatus.PENDING: self.colors.apply("→", self.colors.info)
-            }.get(step.status, self.colors.apply("→", self.colors.info))
+            status_symbol = self._status_symbols.get(step.status, self._default_status_symbol)
         else:
-            status_symbol = self.colors.apply("→", self.colors.info)
+            status_symbol = self._default_status_symbol
         
         # Color-coded action emoji
-        action_emoji = step.action_type.emoji if step.action_type else ""
-        if action_emoji:
-            action_emoji = self.colors.apply(action_emoji, self.colors.info)
+        action_emoji = self._colored_emojis[step.action_type] if step.action_type else ""
         
         # Format step number with info color
         step_number = self.colors.apply(f"STEP {step.number}/?", self.colors.info)
@@ -440,20 +581,20 @@ class TaskLogger:
                            active_element: Optional[str] = None,
                            page_title: Optional[str] = None) -> None:
         """Update the browser state information."""
-        if url is not None:
-            self.context.browser_state.url = url
-        if page_ready is not None:
-            self.context.browser_state.page_ready = page_ready
-        if dynamic_content_loaded is not None:
-            self.context.browser_state.dynamic_content_loaded = dynamic_content_loaded
-        if visible_elements is not None:
-            self.context.browser_state.visible_elements = visible_elements
-        if current_frame is not None:
-            self.context.browser_state.current_frame = current_frame
-        if active_element is not None:
-            self.context.browser_state.active_element = active_element
-        if page_title is not None:
-            self.context.browser_state.page_title = page_title
+        # Keys are BrowserState field names; None means unchanged
+        updates = {
+            "url": url,
+            "page_ready": page_ready,
+            "dynamic_content_loaded": dynamic_content_loaded,
+            "visible_elements": visible_elements,
+            "current_frame": current_frame,
+            "active_element": active_element,
+            "page_title": page_title,
+        }
+        browser_state = self.context.browser_state
+        for name, value in updates.items():
+            if value is not None:
+                setattr(browser_state, name, value)
     
     def log_error(self, error: Exception, step_number: int, action: str) -> None:
         """Log an error with context."""
@@ -465,7 +606,8 @@ class TaskLogger:
             message=str(error),
             step=step_number,
             action=action,
-            traceback=traceback.format_exc()
+            exception=error,
+            exc_traceback=error.__traceback__
         )
         self.context.current_step.status = TaskStatus.FAILED
         
@@ -474,7 +616,7 @@ class TaskLogger:
     
     def start_performance_tracking(self) -> None:
         """Start tracking performance metrics."""
-        self._step_start_time = datetime.utcnow()
+        self._step_start_time = time.monotonic()
     
     def track_step_duration(self, step_type: str, duration: float) -> None:
         """Track the duration of a specific step type."""
@@ -491,10 +633,21 @@ class TaskLogger:
         """Get the current context as a dictionary."""
         return self.context.to_dict()
     
+    def _should_emit(self) -> bool:
+        """Whether state dumps are enabled on the module logger."""
+        return logger.isEnabledFor(logging.INFO)
+    
     def log_state(self) -> None:
         """Log the current state."""
-        state = self.get_context()
-        print(json.dumps(state, indent=2))
+        if not self._should_emit():
+            return
+        # Encode here so later changes to the task cannot leak into the dump;
+        # only the stdout write happens on the writer thread
+        _submit_state((_encode_state(self.get_context()), None))
+    
+    def flush(self) -> None:
+        """Wait until queued state dumps have been written to stdout."""
+        _flush_state_writer()
     
     async def execute_with_retry(
         self,
@@ -508,11 +661,12 @@ class TaskLogger:
             
         attempt = 0
         last_error = None
+        # Computed once per attempt so the logged delay is the one slept
+        delay = retry_config.get_delay(attempt)
         
         while True:
             try:
-                # Calculate and apply delay if this is a retry
-                delay = retry_config.get_delay(attempt)
+                # Apply the delay if this is a retry
                 if delay == -1:  # Max retries exceeded
                     if last_error:
                         raise last_error
@@ -521,8 +675,12 @@ class TaskLogger:
                 if delay > 0:
                     await asyncio.sleep(delay)
                 
-                # Attempt the operation
-                result = await operation()
+                # Attempt the operation, bounded by the per-attempt timeout so a
+                # hung attempt is cancelled instead of holding the retry loop
+                if retry_config.timeout is not None:
+                    result = await asyncio.wait_for(operation(), timeout=retry_config.timeout)
+                else:
+                    result = await operation()
                 
                 # Update retry info on success
                 if self.context.retries is not None:
@@ -534,14 +692,15 @@ class TaskLogger:
             except Exception as e:
                 last_error = e
                 attempt += 1
+                delay = retry_config.get_delay(attempt)
                 
                 # Log the retry attempt
                 if self.context.retries is not None:
                     self.context.retries.history.append({
                         "attempt": attempt,
-                        "timestamp": datetime.utcnow().isoformat(),
+                        "timestamp": _utcnow_iso(),
                         "error": f"{e.__class__.__name__}: {str(e)}",
-                        "delay": retry_config.get_delay(attempt)
+                        "delay": delay
                     })
                 
                 # Update the error context
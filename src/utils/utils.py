@@ -60,6 +60,7 @@ def get_llm_model(provider: str, **kwargs):
             base_url=base_url,
             api_key=api_key,
             timeout=kwargs.get("timeout", 60),
+            http_async_client=kwargs.get("http_async_client"),
         )
     elif provider == "deepseek":
         if not kwargs.get("base_url", ""):
@@ -78,6 +79,7 @@ def get_llm_model(provider: str, **kwargs):
             base_url=base_url,
             api_key=api_key,
             timeout=kwargs.get("timeout", 60),
+            http_async_client=kwargs.get("http_async_client"),
         )
     elif provider == "gemini":
         if not kwargs.get("api_key", ""):
@@ -54,6 +54,29 @@ async def test_concurrent_initialization(browser_controller):
         launch_events = [e for e in browser_events if e["event_type"] == "browser_launched"]
         assert len(launch_events) == 1
 
+@pytest.mark.asyncio
+async def test_cancelled_initialization_caller(browser_controller):
+    mock_browser = AsyncMock()
+    mock_playwright = AsyncMock()
+    launch_gate = asyncio.Event()
+
+    async def slow_launch(**kwargs):
+        await launch_gate.wait()
+        return mock_browser
+
+    mock_playwright.chromium.launch = AsyncMock(side_effect=slow_launch)
+
+    with patch('src.utils.browser_controller.async_playwright',
+               return_value=AsyncMock(start=AsyncMock(return_value=mock_playwright))):
+        # A caller that gives up must not cancel the shared initialization
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(browser_controller.initialize(), timeout=0.01)
+
+        launch_gate.set()
+        await browser_controller.initialize()
+        assert browser_controller.init_count == 1
+        assert browser_controller.browser == mock_browser
+
 @pytest.mark.asyncio
 async def test_browser_launch_options(browser_controller):
     mock_browser = AsyncMock()
@@ -122,4 +145,56 @@ async def test_browser_cleanup(browser_controller):
         assert len(cleanup_events) >= 2  # At least start and complete events
         assert cleanup_events[0]["status"] == "starting"
         assert cleanup_events[-1]["status"] == "completed"
-        assert cleanup_events[-1]["progress"] == 1.0 
\ No newline at end of file
+        assert cleanup_events[-1]["progress"] == 1.0 
+@pytest.mark.asyncio
+async def test_browser_pool_acquire_release(browser_controller, monkeypatch):
+    monkeypatch.setenv("BROWSER_POOL_SIZE", "2")
+    mock_browsers = [AsyncMock(), AsyncMock()]
+    mock_playwright = AsyncMock()
+    mock_playwright.chromium.launch = AsyncMock(side_effect=mock_browsers)
+    
+    with patch('src.utils.browser_controller.async_playwright', 
+               return_value=AsyncMock(start=AsyncMock(return_value=mock_playwright))):
+        first_ctx, first_browser = await browser_controller.acquire_context()
+        second_ctx, second_browser = await browser_controller.acquire_context()
+        
+        # Each checkout gets its own warm browser and a fresh context
+        assert mock_playwright.chromium.launch.call_count == 2
+        assert {first_browser, second_browser} == set(mock_browsers)
+        first_browser.new_context.assert_called_once()
+        
+        await browser_controller.release(first_browser, first_ctx)
+        first_ctx.close.assert_called_once()
+        
+        # The released browser is handed out again without a new launch
+        _, reused_browser = await browser_controller.acquire_context()
+        assert reused_browser is first_browser
+        assert mock_playwright.chromium.launch.call_count == 2
+        
+        await browser_controller.cleanup()
+        for browser in mock_browsers:
+            browser.close.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_browser_cleanup_close_failure(browser_controller, monkeypatch):
+    monkeypatch.setenv("BROWSER_POOL_SIZE", "2")
+    mock_browsers = [AsyncMock(), AsyncMock()]
+    mock_browsers[0].close.side_effect = Exception("Browser close failed")
+    mock_playwright = AsyncMock()
+    mock_playwright.chromium.launch = AsyncMock(side_effect=mock_browsers)
+    
+    with patch('src.utils.browser_controller.async_playwright', 
+               return_value=AsyncMock(start=AsyncMock(return_value=mock_playwright))):
+        await browser_controller.initialize()
+        await browser_controller.cleanup()
+        
+        # The failure is logged and the rest of cleanup still runs
+        for browser in mock_browsers:
+            browser.close.assert_called_once()
+        mock_playwright.stop.assert_called_once()
+        assert browser_controller._playwright is None
+        assert browser_controller.init_count == 0
+        
+        browser_events = browser_controller.logger.get_browser_events()
+        error_event = next(e for e in browser_events if e["event_type"] == "browser_close_failed")
+        assert "Browser close failed" in error_event["details"]["error"]
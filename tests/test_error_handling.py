@@ -61,6 +61,15 @@ class TestErrorHandler:
         # Should have waited at least 3 seconds (1 + 2)
         assert duration >= 3
 
+    @pytest.mark.asyncio
+    async def test_deadline_stops_retries(self):
+        handler = ErrorHandler(deadline_s=0.5)
+        error = ValueError("Test error")
+
+        # The first backoff (at least 1 second) would overrun the deadline
+        with pytest.raises(MaxRetriesExceededError):
+            await handler.handle_error(error, "test_operation")
+
     @pytest.mark.asyncio
     async def test_error_code_extraction(self, handler):
         # Test with connection error
@@ -161,6 +161,16 @@ class TestBatchedEventLogger:
         assert parsed["event_type"] == "batched_ui_action"
         assert parsed["data"]["count"] == 3
         assert parsed["data"]["events"] == events
+    
+    def test_batch_flushes_when_full(self, logger, string_io):
+        batched_logger = BatchedEventLogger(logger, max_batch_size=2)
+        batched_logger.add_event("ui_action", {"action": "click"})
+        assert string_io.getvalue() == ""
+        
+        batched_logger.add_event("ui_action", {"action": "type"})
+        
+        parsed = json.loads(string_io.getvalue())
+        assert parsed["data"]["count"] == 2
 
 class TestLoggingSetup:
     @pytest.fixture
@@ -102,6 +102,27 @@ def test_clear_history(structured_logger):
     assert len(structured_logger.get_browser_events()) == 0
     assert structured_logger.get_current_progress() == 0.0
 
+def test_progress_updates_are_batched(structured_logger, caplog):
+    with caplog.at_level(logging.INFO, logger="test_logger"):
+        structured_logger.log_progress("step1", "started", 0.0, "Starting")
+        structured_logger.log_progress("step1", "completed", 1.0, "Done")
+        assert not caplog.records
+        
+        structured_logger.flush()
+    
+    assert len(caplog.records) == 1
+    assert caplog.records[0].event_type == "batched_progress"
+    assert caplog.records[0].data["count"] == 2
+
+def test_history_is_bounded():
+    logger = StructuredLogger("test_logger", history_maxlen=2)
+    for i in range(3):
+        logger.log_progress(f"step_{i}", "completed", i / 2, f"Step {i}")
+    
+    history = logger.get_progress_history()
+    assert [event["step"] for event in history] == ["step_1", "step_2"]
+    assert logger.get_dropped_counts() == {"progress": 1, "browser": 0}
+
 def test_json_formatter():
     formatter = JSONFormatter()
     record = logging.LogRecord(
@@ -137,6 +137,19 @@ def test_error_handling():
     assert context["error"]["step"] == 1
     assert context["error"]["action"] == "test action"
 
+def test_error_with_given_traceback():
+    logger = TaskLogger("error_task", "Test error handling")
+    logger.context.error = ErrorInfo(
+        type="ValueError",
+        message="Test error",
+        step=1,
+        action="test action",
+        traceback="Traceback (most recent call last): ..."
+    )
+    
+    context = logger.get_context()
+    assert context["error"]["traceback"] == "Traceback (most recent call last): ..."
+
 def test_performance_metrics():
     logger = TaskLogger("perf_task", "Test performance tracking")
     
@@ -428,6 +441,15 @@ def test_retry_backoff_calculation():
     assert config.get_delay(3) == 4.0  # Within max
     assert config.get_delay(4) == 5.0  # Capped at max
 
+def test_retry_config_changes_after_creation():
+    config = RetryConfig(max_retries=2, base_delay=1.0, max_delay=10.0, jitter=0.0)
+    config.max_retries = 4
+    config.base_delay = 2.0
+    config.max_delay = 6.0
+    
+    assert config.get_delay(2) == 4.0
+    assert config.get_delay(4) == 6.0  # Capped at the new max
+
 def test_color_scheme():
     """Test that color scheme is properly defined and accessible."""
     scheme = ColorScheme()
@@ -4,7 +4,7 @@ import json
 import zipfile
 from pathlib import Path
 import tempfile
-from src.trace_analyzer import PlaywrightTrace, analyze_trace
+from src.trace_analyzer import PlaywrightTrace, analyze_trace, EnhancedTraceAnalyzer
 
 # Sample trace data
 SAMPLE_TRACE_DATA = [
@@ -131,6 +131,21 @@ async def test_analyze_trace(sample_trace_file):
     assert summary["failed_requests"] == 1
     assert summary["total_errors"] == 1
 
+@pytest.mark.asyncio
+async def test_analyze_all_returns_plain_dict(tmp_path):
+    """analyze_all returns a JSON-serializable dict; laziness is opt-in."""
+    trace_file = tmp_path / "trace.zip"
+    with zipfile.ZipFile(trace_file, 'w') as zf:
+        zf.writestr('trace.trace', '\n'.join(json.dumps(event) for event in SAMPLE_TRACE_DATA))
+        zf.writestr('trace.network', '')
+    
+    analyzer = EnhancedTraceAnalyzer(str(trace_file))
+    result = await analyzer.analyze_all()
+    
+    assert isinstance(result, dict)
+    assert json.loads(json.dumps(result)) == result
+    assert (await analyzer.analyze_lazy()).to_dict() == result
+
 @pytest.mark.asyncio
 async def test_invalid_trace_file():
     """Test handling of invalid trace files."""